@@ -0,0 +1,34 @@
+from pathlib import Path
+import argparse
+import json
+
+METRICS = [
+    ("tokens_per_second", lambda result: result.get("tokens_per_second"), True),
+    ("p50_ms", lambda result: result.get("file_latency_ms", {}).get("p50"), False),
+    ("operation_s", lambda result: result.get("stages_seconds", {}).get("operation"), False),
+    ("save_s", lambda result: result.get("stages_seconds", {}).get("save"), False),
+    ("peak_rss_mb", lambda result: result.get("peak_rss_mb"), False),
+]
+
+def load(path: Path) -> dict:
+    report = json.loads(path.read_text(encoding="utf-8"))
+    return {(result["operation"], result["analyzer"]): result for result in report["results"]}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    args = parser.parse_args()
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    print(f"{'operation':<20} {'analyzer':<10} {'metric':<18} {'baseline':>12} {'candidate':>12} {'change':>9}")
+    for key in sorted(set(baseline) & set(candidate)):
+        for metric, extract, higher_is_better in METRICS:
+            old, new = extract(baseline[key]), extract(candidate[key])
+            if old is None or new is None:
+                continue
+            change = (new - old) / old * 100 if old else 0.0
+            marker = "+" if (change > 0) == higher_is_better and change != 0 else ""
+            print(f"{key[0]:<20} {key[1]:<10} {metric:<18} {old:>12} {new:>12} {change:>8.1f}% {marker}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
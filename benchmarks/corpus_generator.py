@@ -0,0 +1,93 @@
+from pathlib import Path
+from typing import List
+import argparse
+import random
+from xml.sax.saxutils import escape
+
+NOUNS = [
+    "год", "человек", "время", "дело", "жизнь", "день", "рука", "работа", "слово", "место",
+    "город", "страна", "вопрос", "сторона", "дом", "мир", "случай", "голова", "ребёнок", "сила",
+    "конец", "вид", "система", "часть", "закон", "история", "власть", "рынок", "компания", "решение",
+    "война", "земля", "право", "газета", "правительство", "президент", "школа", "улица", "книга", "проект",
+]
+NOUN_ENDINGS = ["", "а", "у", "ом", "е", "ы", "ов", "ам", "ами", "ах"]
+ADJECTIVES = [
+    "нов", "стар", "больш", "молод", "красн", "бел", "добр", "прост", "важн", "полн",
+    "деревянн", "железн", "городск", "государственн", "российск", "экономическ", "интересн", "быстр", "сильн", "общ",
+]
+ADJECTIVE_ENDINGS = ["ый", "ого", "ому", "ым", "ая", "ой", "ую", "ое", "ые", "ых", "ыми"]
+VERBS = [
+    "говор", "дела", "чита", "работа", "дума", "зна", "понима", "реша", "получа", "жив",
+    "счита", "стро", "игра", "писа", "отвеча", "смотр", "ход", "продолжа", "начина", "предлага",
+]
+VERB_ENDINGS = ["ть", "ет", "ют", "л", "ла", "ли", "ем", "ешь", "ем", "ло"]
+FUNCTION_WORDS = [
+    "и", "в", "не", "на", "что", "с", "по", "как", "а", "но", "к", "у", "из", "за", "от", "о", "же", "для", "до", "это",
+]
+
+class CorpusGenerator:
+    def __init__(self, seed: int = 42, vocabulary_size: int = 5000):
+        self.random = random.Random(seed)
+        forms = (
+            [stem + ending for stem in NOUNS for ending in NOUN_ENDINGS] +
+            [stem + ending for stem in ADJECTIVES for ending in ADJECTIVE_ENDINGS] +
+            [stem + ending for stem in VERBS for ending in VERB_ENDINGS]
+        )
+        self.random.shuffle(forms)
+        self.vocabulary = FUNCTION_WORDS + forms[:max(0, vocabulary_size - len(FUNCTION_WORDS))]
+        # Zipf-like weights: the n-th most frequent form has weight 1 / n
+        self.weights = [1.0 / rank for rank in range(1, len(self.vocabulary) + 1)]
+
+    def sentence(self) -> str:
+        length = self.random.randint(5, 20)
+        words = self.random.choices(self.vocabulary, weights=self.weights, k=length)
+        if self.random.random() < 0.1:
+            words.insert(self.random.randrange(len(words)), str(self.random.randint(1900, 2024)))
+        return words[0].capitalize() + " " + " ".join(words[1:]) + self.random.choice([".", ".", ".", "!", "?"])
+
+    def document(self, words: int) -> str:
+        sentences = []
+        count = 0
+        while count < words:
+            sentence = self.sentence()
+            sentences.append(sentence)
+            count += sentence.count(" ") + 1
+        paragraphs = [" ".join(sentences[i:i + 5]) for i in range(0, len(sentences), 5)]
+        return "\n".join(paragraphs)
+
+    def generate(self, output_dir: Path, years: List[int], files_per_year: int, words_per_file: int,
+                 xml_ratio: float = 0.3) -> Path:
+        output_dir = Path(output_dir)
+        for year in years:
+            year_dir = output_dir / str(year)
+            year_dir.mkdir(parents=True, exist_ok=True)
+            for index in range(files_per_year):
+                # file sizes vary around words_per_file so workers see uneven load
+                text = self.document(max(1, int(words_per_file * self.random.uniform(0.2, 1.8))))
+                if self.random.random() < xml_ratio:
+                    body = "".join(f"<p>{escape(paragraph)}</p>\n" for paragraph in text.split("\n"))
+                    (year_dir / f"doc_{index:05d}.xml").write_text(
+                        f"<?xml version=\"1.0\" encoding=\"utf-8\"?>\n<doc year=\"{year}\">\n{body}</doc>\n",
+                        encoding="utf-8"
+                    )
+                else:
+                    (year_dir / f"doc_{index:05d}.txt").write_text(text, encoding="utf-8")
+        return output_dir
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic Russian corpus")
+    parser.add_argument("output_dir", type=Path)
+    parser.add_argument("--years", type=int, nargs=2, default=[2000, 2004], metavar=("FIRST", "LAST"))
+    parser.add_argument("--files-per-year", type=int, default=50)
+    parser.add_argument("--words-per-file", type=int, default=500)
+    parser.add_argument("--xml-ratio", type=float, default=0.3)
+    parser.add_argument("--vocabulary-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    CorpusGenerator(args.seed, args.vocabulary_size).generate(
+        args.output_dir, list(range(args.years[0], args.years[1] + 1)),
+        args.files_per_year, args.words_per_file, args.xml_ratio
+    )
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
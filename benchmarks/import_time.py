@@ -0,0 +1,43 @@
+import argparse
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ["pandas", "numpy", "scipy", "matplotlib", "pymorphy2", "nltk", "pymystem3", "requests", "bs4", "lxml", "pyarrow"]
+
+def measure(module: str) -> dict:
+    # a fresh interpreter per measurement, otherwise everything is already in sys.modules
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         f"import sys, json, {module}; print(json.dumps(sorted(m for m in sys.modules if '.' not in m)))"],
+        capture_output=True, text=True, check=True
+    )
+    cumulative_us = 0
+    for line in completed.stderr.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            cumulative_us = int(parts[1])
+    loaded = set(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return {
+        "module": module,
+        "import_ms": round(cumulative_us / 1000, 1),
+        "heavy_modules": [name for name in HEAVY_MODULES if name in loaded],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the CLI starts without loading heavy dependencies")
+    parser.add_argument("--module", default="src.app")
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    runs = [measure(args.module) for _ in range(args.repeat)]
+    best = min(run["import_ms"] for run in runs)
+    heavy = runs[0]["heavy_modules"]
+    print(f"{args.module}: {best} ms (best of {args.repeat}), budget {args.budget_ms} ms")
+    if heavy:
+        print(f"Heavy modules loaded at startup: {', '.join(heavy)}")
+    if heavy or best > args.budget_ms:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
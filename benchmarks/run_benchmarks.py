@@ -0,0 +1,182 @@
+from src.util.file_handler import FileHandler
+from src.util.plotter import Plotter
+from src.model.enums import PlotType, PlotMode, ExecutionMode
+from src.model.settings import RunSettings
+from src.util.instrumentation import instrumentation
+from .corpus_generator import CorpusGenerator
+from datetime import datetime, timezone
+from pathlib import Path
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+OPERATIONS = ["lemmatization", "pos_count", "pos_word_count", "adjective_analysis"]
+ANALYZERS = ["pymorphy2", "pymystem3"]
+
+def make_analyzer(name: str, settings: RunSettings):
+    if name == "pymorphy2":
+        from src.analyzer.pymorphy2_analyzer import Pymorphy2Analyzer
+        return Pymorphy2Analyzer()
+    if name == "pymystem3":
+        from src.analyzer.pymystem3_analyzer import Pymystem3Analyzer
+        return Pymystem3Analyzer(pool_size=settings.max_workers)
+    raise ValueError(f"Unknown analyzer: {name}")
+
+def run_operation(name: str, file_handler, plotter, settings, periods, corpus: Path, analyzer):
+    if name == "lemmatization":
+        from src.operation.lemmatization import LemmatizationOperation
+        LemmatizationOperation(file_handler, plotter, settings).execute(periods, corpus, analyzer, PlotType.BAR)
+    elif name == "pos_count":
+        from src.operation.pos_count import POSCountOperation
+        POSCountOperation(file_handler, plotter, settings).execute(periods, corpus, analyzer, PlotType.BAR)
+    elif name == "pos_word_count":
+        from src.operation.pos_word_count import POSWordCountOperation
+        operation = POSWordCountOperation(file_handler, plotter, settings)
+        # execute() ends in the interactive explorer, so run the non-interactive part only
+        lemma_counts, word_counts = operation.process_files(periods, corpus, analyzer)
+        operation.save_results(lemma_counts, word_counts)
+    elif name == "adjective_analysis":
+        from src.operation.adjective_analysis import AdjectiveAnalysisOperation
+        from src.analyzer.adjective_analyzer.open_corpora_analyzer import OpenCorporaAdjectiveAnalyzer
+        AdjectiveAnalysisOperation(file_handler, plotter, OpenCorporaAdjectiveAnalyzer(), settings).execute(
+            periods, corpus, analyzer, PlotType.BAR
+        )
+    else:
+        raise ValueError(f"Unknown operation: {name}")
+
+def corpus_files(corpus: Path):
+    years = sorted(entry.name for entry in corpus.iterdir() if entry.is_dir() and entry.name.isdigit())
+    files = []
+    for year in years:
+        files.extend(sorted((corpus / year).glob("*.txt")) + sorted((corpus / year).glob("*.xml")))
+    return years, files
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux; children covers process-pool workers
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) / 1024, 1)
+
+def run_single(operation_name: str, analyzer_name: str, corpus: Path, settings: RunSettings,
+               plot_mode: PlotMode) -> dict:
+    years, files = corpus_files(corpus)
+    periods = [(year, year) for year in years]
+    analyzer = make_analyzer(analyzer_name, settings)
+    file_handler = FileHandler(tempfile.mkdtemp(prefix="bench-results-"))
+    plotter = Plotter(plot_mode, settings.max_workers)
+
+    # latencies, tokens and stage timings come from the measured run itself; the slowest-files heap
+    # is sized to the corpus so it keeps every file
+    instrumentation.slowest_files = len(files)
+    instrumentation.enable(progress=False)
+    started = time.perf_counter()
+    run_operation(operation_name, file_handler, plotter, settings, periods, corpus, analyzer)
+    plotter.flush()
+    operation_seconds = time.perf_counter() - started
+    instrumentation.disable()
+
+    latencies = sorted(seconds for seconds, _, _ in instrumentation.slowest)
+    tokens = instrumentation.counters["tokens"]
+    # stage seconds are summed over all workers, operation is wall time
+    stages = {name: round(seconds, 4) for name, seconds in sorted(instrumentation.stage_seconds.items())}
+    stages["operation"] = round(operation_seconds, 4)
+    return {
+        "operation": operation_name,
+        "analyzer": analyzer_name,
+        "files": instrumentation.counters["files"],
+        "tokens": tokens,
+        "tokens_per_second": round(tokens / operation_seconds, 1) if operation_seconds else None,
+        "file_latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 3) if latencies else None,
+            "p50": round(latencies[len(latencies) // 2] * 1000, 3) if latencies else None,
+            "p95": round(latencies[int(len(latencies) * 0.95)] * 1000, 3) if latencies else None,
+            "max": round(latencies[-1] * 1000, 3) if latencies else None,
+        },
+        "stages_seconds": stages,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark operations x analyzers on a synthetic corpus")
+    parser.add_argument("--corpus", type=Path, help="existing <year>/ corpus; generated when omitted")
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS, default=OPERATIONS)
+    parser.add_argument("--analyzers", nargs="+", choices=ANALYZERS, default=ANALYZERS)
+    parser.add_argument("--years", type=int, nargs=2, default=[2000, 2002], metavar=("FIRST", "LAST"))
+    parser.add_argument("--files-per-year", type=int, default=40)
+    parser.add_argument("--words-per-file", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mode", choices=[mode.value for mode in ExecutionMode], default=ExecutionMode.THREAD.value)
+    parser.add_argument("--workers", type=int, default=RunSettings.default_workers())
+    parser.add_argument("--plot-mode", choices=[mode.value for mode in PlotMode], default=PlotMode.IMMEDIATE.value)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--single", nargs=2, metavar=("OPERATION", "ANALYZER"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    settings = RunSettings(ExecutionMode(args.mode), args.workers)
+
+    if args.single:
+        print(json.dumps(run_single(args.single[0], args.single[1], args.corpus, settings, PlotMode(args.plot_mode))))
+        return
+
+    corpus = args.corpus
+    corpus_config = {"path": str(corpus)} if corpus else {
+        "years": args.years, "files_per_year": args.files_per_year,
+        "words_per_file": args.words_per_file, "seed": args.seed,
+    }
+    if corpus is None:
+        corpus = CorpusGenerator(args.seed).generate(
+            Path(tempfile.mkdtemp(prefix="bench-corpus-")), list(range(args.years[0], args.years[1] + 1)),
+            args.files_per_year, args.words_per_file
+        )
+
+    results = []
+    for operation_name in args.operations:
+        for analyzer_name in args.analyzers:
+            print(f"{operation_name} x {analyzer_name}...", file=sys.stderr)
+            # a fresh interpreter per pair keeps peak RSS and caches independent
+            completed = subprocess.run(
+                [sys.executable, "-m", "benchmarks.run_benchmarks", "--single", operation_name, analyzer_name,
+                 "--corpus", str(corpus), "--mode", args.mode, "--workers", str(args.workers),
+                 "--plot-mode", args.plot_mode],
+                capture_output=True, text=True
+            )
+            if completed.returncode != 0:
+                results.append({
+                    "operation": operation_name, "analyzer": analyzer_name,
+                    "error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "failed",
+                })
+                continue
+            results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {"mode": args.mode, "workers": args.workers, "plot_mode": args.plot_mode},
+        "corpus": corpus_config,
+        "results": results,
+    }
+    output = args.output or Path("benchmarks") / "results" / f"{commit[:12]}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Saved {output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,8 +1,4 @@
-from src.app import TextAnalyzerApp
-
-def main():
-    app = TextAnalyzerApp()
-    app.run()
+from src.cli import main
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,81 @@
+from array import array
+from pathlib import Path
+from typing import Dict
+import mmap
+import os
+import struct
+import sys
+
+MAGIC = b"TALEXICON"
+FORMAT_VERSION = 1
+# magic, version, entry count; 16 bytes keep the offset table that follows 4-byte aligned
+HEADER = struct.Struct("<9sxHI")
+CLASSES = ["качественное", "относительное", "качественное и относительное"]
+
+def write_lexicon(path: Path, classifications: Dict[str, str]):
+    # entries sorted by their UTF-8 bytes, which is the same order as sorting the strings
+    lemmas = sorted(classifications)
+    offsets = array("I", [0])
+    blob = bytearray()
+    for lemma in lemmas:
+        blob += lemma.encode("utf-8")
+        offsets.append(len(blob))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    codes = bytes(CLASSES.index(classifications[lemma]) for lemma in lemmas)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(path.name + ".tmp")
+    with open(temporary_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(lemmas)))
+        f.write(offsets.tobytes())
+        f.write(codes)
+        f.write(blob)
+    os.replace(temporary_path, path)
+
+class AdjectiveLexicon:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            # the pages are shared by every process that maps the file and are only read when touched
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < HEADER.size:
+            raise ValueError(f"{self.path} is not an adjective lexicon")
+        magic, version, self.count = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not an adjective lexicon")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{self.path} has format version {version}, expected {FORMAT_VERSION}")
+        if sys.byteorder != "little":
+            raise ValueError("Adjective lexicons can only be read on little-endian machines")
+        codes_start = HEADER.size + 4 * (self.count + 1)
+        self.strings_start = codes_start + self.count
+        view = memoryview(self.map)
+        self.offsets = view[HEADER.size:codes_start].cast("I")
+        self.codes = view[codes_start:self.strings_start]
+        if len(self.map) != self.strings_start + self.offsets[self.count]:
+            raise ValueError(f"{self.path} is truncated")
+
+    def __len__(self):
+        return self.count
+
+    def _key(self, index: int) -> bytes:
+        return self.map[self.strings_start + self.offsets[index]:self.strings_start + self.offsets[index + 1]]
+
+    def get(self, lemma: str) -> str:
+        key = lemma.lower().encode("utf-8")
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self._key(low) == key:
+            return CLASSES[self.codes[low]]
+        return None
+
+    def close(self):
+        self.offsets.release()
+        self.codes.release()
+        self.map.close()
\ No newline at end of file
@@ -0,0 +1,57 @@
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable
+import os
+import sqlite3
+import time
+
+class ClassificationCache:
+    def __init__(self, path: str = "cache/wiktionary.sqlite", ttl_days: float = 30):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_days * 86400
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = Lock()
+        self._connect()
+
+    def _connect(self):
+        self.pid = os.getpid()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS classifications ("
+                "lemma TEXT PRIMARY KEY, classification TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+
+    def __reduce__(self):
+        return (self.__class__, (str(self.path), self.ttl_seconds / 86400))
+
+    def _check_pid(self):
+        # sqlite connections must not be shared with forked workers
+        if self.pid != os.getpid():
+            self._connect()
+
+    def get_many(self, lemmas: Iterable[str]) -> Dict[str, str]:
+        lemmas = list(lemmas)
+        oldest = time.time() - self.ttl_seconds
+        found = {}
+        with self.lock:
+            self._check_pid()
+            for i in range(0, len(lemmas), 500):
+                chunk = lemmas[i:i + 500]
+                rows = self.connection.execute(
+                    f"SELECT lemma, classification FROM classifications "
+                    f"WHERE fetched_at >= ? AND lemma IN ({','.join('?' * len(chunk))})",
+                    [oldest, *chunk]
+                )
+                found.update(rows)
+        return found
+
+    def put_many(self, classifications: Dict[str, str]):
+        now = time.time()
+        with self.lock:
+            self._check_pid()
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO classifications (lemma, classification, fetched_at) VALUES (?, ?, ?)",
+                    [(lemma, classification, now) for lemma, classification in classifications.items()]
+                )
\ No newline at end of file
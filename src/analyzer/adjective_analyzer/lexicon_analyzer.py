@@ -0,0 +1,27 @@
+from ...interface.adjective_analyzer import AdjectiveAnalyzer
+from .adjective_lexicon import AdjectiveLexicon
+from pathlib import Path
+from threading import Lock
+
+class LexiconAdjectiveAnalyzer(AdjectiveAnalyzer):
+    def __init__(self, path: Path = Path("adjectives.lexicon")):
+        self.path = Path(path)
+        self.lexicon = AdjectiveLexicon(self.path)
+        self.fallback = None
+        self.lock = Lock()
+
+    def __reduce__(self):
+        return (self.__class__, (self.path,))
+
+    def get_qualitative_or_relative(self, lemma: str) -> str:
+        classification = self.lexicon.get(lemma)
+        if classification is not None:
+            return classification
+        # words outside the dictionary are classified like OpenCorporaAdjectiveAnalyzer does,
+        # the morphological dictionary is loaded only if such a word shows up
+        if self.fallback is None:
+            with self.lock:
+                if self.fallback is None:
+                    from .open_corpora_analyzer import OpenCorporaAdjectiveAnalyzer
+                    self.fallback = OpenCorporaAdjectiveAnalyzer()
+        return self.fallback.get_qualitative_or_relative(lemma)
\ No newline at end of file
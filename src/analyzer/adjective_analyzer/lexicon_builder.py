@@ -0,0 +1,64 @@
+from .adjective_lexicon import write_lexicon
+from .open_corpora_analyzer import OpenCorporaAdjectiveAnalyzer
+from .wiktionary_client import classify_text
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+import bz2
+import re
+import xml.etree.ElementTree as ET
+
+_LANGUAGE_HEADER = re.compile(r"^=\s*\{\{-([\w-]+)-\}\}\s*=\s*$", re.M)
+
+def adjective_lemmas(morph) -> Iterator[str]:
+    # normal forms sit at index 0 of their paradigm, so a tag is only built for lemmas
+    dictionary = morph.dictionary
+    for word, (para_id, index) in dictionary.words.iteritems():
+        if index == 0 and "ADJF" in dictionary.build_tag_info(para_id, 0):
+            yield word
+
+def russian_section(wikitext: str) -> str:
+    parts = _LANGUAGE_HEADER.split(wikitext)
+    for language, section in zip(parts[1::2], parts[2::2]):
+        if language == "ru":
+            return section
+    return ""
+
+def wiktionary_classifications(dump_path: Path) -> Iterator[Tuple[str, str]]:
+    dump_path = Path(dump_path)
+    opener = bz2.open if dump_path.suffix == ".bz2" else open
+    with opener(dump_path, "rb") as f:
+        title = namespace = root = None
+        # pages are streamed and dropped from the root one at a time, a full dump never has to fit in memory
+        for event, element in ET.iterparse(f, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = element
+                continue
+            tag = element.tag.rpartition("}")[2]
+            if tag == "title":
+                title = element.text
+            elif tag == "ns":
+                namespace = element.text
+            elif tag == "text":
+                if namespace == "0" and title and element.text:
+                    classification = classify_text(russian_section(element.text))
+                    if classification:
+                        yield title.lower(), classification
+            elif tag == "page":
+                root.clear()
+
+def build_lexicon(output_path: Path, wiktionary_dump: Path = None) -> Dict[str, int]:
+    opencorpora = OpenCorporaAdjectiveAnalyzer()
+    # the same rule as OpenCorporaAdjectiveAnalyzer, applied once to every adjective in the dictionary
+    classifications = {
+        lemma: opencorpora.get_qualitative_or_relative(lemma) for lemma in set(adjective_lemmas(opencorpora.morph))
+    }
+    stats = {"opencorpora": len(classifications), "wiktionary": 0}
+    if wiktionary_dump is not None:
+        # Wiktionary wins where it has an answer, as in WiktionaryAdjectiveAnalyzer
+        for lemma, classification in wiktionary_classifications(wiktionary_dump):
+            classifications[lemma] = classification
+            stats["wiktionary"] += 1
+    write_lexicon(output_path, classifications)
+    stats["total"] = len(classifications)
+    return stats
\ No newline at end of file
@@ -1,13 +1,16 @@
 from ...interface.adjective_analyzer import AdjectiveAnalyzer
-import pymorphy2
+from ..parse_cache import ParseCache, shared_parse_cache
+from ..morph_registry import shared_morph_registry
 
 class OpenCorporaAdjectiveAnalyzer(AdjectiveAnalyzer):
-    def __init__(self):
-        self.morph = pymorphy2.MorphAnalyzer()
+    def __init__(self, parse_cache: ParseCache = None):
+        self.morph = shared_morph_registry.get()
+        self.parse_cache = parse_cache or shared_parse_cache
+
+    def __reduce__(self):
+        return (self.__class__, ())
 
     def get_qualitative_or_relative(self, lemma: str) -> str:
-        parses = self.morph.parse(lemma)
-        for parsed in parses:
-            if 'Qual' in parsed.tag:
-                return "качественное"
+        if self.parse_cache.parse(self.morph, lemma).qualitative:
+            return "качественное"
         return "относительное"
\ No newline at end of file
@@ -1,32 +1,35 @@
 from ...interface.adjective_analyzer import AdjectiveAnalyzer
 from .open_corpora_analyzer import OpenCorporaAdjectiveAnalyzer
-import pymorphy2
-import requests
-from bs4 import BeautifulSoup
+from .wiktionary_client import WiktionaryClient
+from .classification_cache import ClassificationCache
+from ...util.instrumentation import instrumentation
+from typing import Dict, Iterable
 
 class WiktionaryAdjectiveAnalyzer(AdjectiveAnalyzer):
-    def __init__(self):
+    def __init__(self, client: WiktionaryClient = None, cache: ClassificationCache = None):
         self.morph = OpenCorporaAdjectiveAnalyzer()
+        self.client = client or WiktionaryClient()
+        self.cache = cache
+
+    def __reduce__(self):
+        return (self.__class__, (self.client, self.cache))
 
     def get_qualitative_or_relative(self, lemma: str) -> str:
-        try:
-            url = f"https://ru.wiktionary.org/wiki/{lemma}"
-            headers = {'User-Agent': 'Mozilla/5.0'}
-            response = requests.get(url, headers=headers, timeout=5)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            content = soup.find('div', class_='mw-parser-output')
-            if not content:
-                return self.morph.get_qualitative_or_relative(lemma)
-            text = content.get_text().lower()
-            if 'качественное и относительное' in text or 'относительное и качественное' in text:
-                return "качественное и относительное"
-            elif 'качественное' in text:
-                return "качественное"
-            elif 'относительное' in text:
-                return "относительное"
-            else:
-                return self.morph.get_qualitative_or_relative(lemma)
-        except Exception as e:
-            print(f"Error fetching Wiktionary for {lemma}: {e}")
-            return self.morph.get_qualitative_or_relative(lemma)
+        return self.classify_many([lemma])[lemma]
+
+    def classify_many(self, lemmas: Iterable[str]) -> Dict[str, str]:
+        lemmas = list(dict.fromkeys(lemmas))
+        found = self.cache.get_many(lemmas) if self.cache is not None else {}
+        missing = [lemma for lemma in lemmas if lemma not in found]
+        instrumentation.count("classification_cache_hits", len(found))
+        instrumentation.count("classification_cache_misses", len(missing))
+        if missing:
+            with instrumentation.stage("wiktionary_fetch"):
+                fetched = self.client.fetch_many(missing)
+            if self.cache is not None:
+                self.cache.put_many(fetched)
+            found.update(fetched)
+        return {
+            lemma: found.get(lemma) or self.morph.get_qualitative_or_relative(lemma)
+            for lemma in lemmas
+        }
@@ -0,0 +1,85 @@
+from bs4 import BeautifulSoup, SoupStrainer
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Dict, Iterable
+import requests
+from requests.adapters import HTTPAdapter
+import time
+
+def classify_text(text: str) -> str:
+    text = text.lower()
+    if 'качественное и относительное' in text or 'относительное и качественное' in text:
+        return "качественное и относительное"
+    elif 'качественное' in text:
+        return "качественное"
+    elif 'относительное' in text:
+        return "относительное"
+    return WiktionaryClient.NO_INFO
+
+class RateLimiter:
+    def __init__(self, requests_per_second: float = None):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self.lock = Lock()
+        self.next_slot = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+class WiktionaryClient:
+    NO_INFO = ""
+
+    def __init__(self, base_url: str = "https://ru.wiktionary.org/wiki/", concurrency: int = 8,
+                 requests_per_second: float = 10.0, timeout: float = 5):
+        if concurrency < 1:
+            raise ValueError("Wiktionary concurrency must be positive")
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.requests_per_second = requests_per_second
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': 'Mozilla/5.0'})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.strainer = SoupStrainer('div', class_='mw-parser-output')
+
+    def __reduce__(self):
+        return (self.__class__, (self.base_url, self.concurrency, self.requests_per_second, self.timeout))
+
+    def fetch_classification(self, lemma: str) -> str:
+        self.rate_limiter.wait()
+        response = self.session.get(f"{self.base_url}{lemma}", timeout=self.timeout)
+        if response.status_code in (404, 410):
+            # no article for the lemma is an answer, cached like an article without a classification
+            return self.NO_INFO
+        # transport errors and other failures are skipped and tried again on the next run
+        response.raise_for_status()
+        soup = BeautifulSoup(response.content, 'lxml', parse_only=self.strainer)
+        content = soup.find('div', class_='mw-parser-output')
+        if not content:
+            return self.NO_INFO
+        return classify_text(content.get_text())
+
+    def fetch_many(self, lemmas: Iterable[str]) -> Dict[str, str]:
+        lemmas = list(dict.fromkeys(lemmas))
+        if len(lemmas) <= 1:
+            results = [self._fetch_safe(lemma) for lemma in lemmas]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(lemmas))) as executor:
+                results = list(executor.map(self._fetch_safe, lemmas))
+        return {lemma: classification for lemma, classification in results if classification is not None}
+
+    def _fetch_safe(self, lemma: str):
+        try:
+            return lemma, self.fetch_classification(lemma)
+        except Exception as e:
+            print(f"Error fetching Wiktionary for {lemma}: {e}")
+            return lemma, None
\ No newline at end of file
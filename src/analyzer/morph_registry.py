@@ -0,0 +1,16 @@
+from threading import Lock
+import pymorphy2
+
+class MorphRegistry:
+    def __init__(self):
+        self.morph = None
+        self.lock = Lock()
+
+    def get(self) -> pymorphy2.MorphAnalyzer:
+        if self.morph is None:
+            with self.lock:
+                if self.morph is None:
+                    self.morph = pymorphy2.MorphAnalyzer()
+        return self.morph
+
+shared_morph_registry = MorphRegistry()
\ No newline at end of file
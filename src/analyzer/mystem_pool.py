@@ -0,0 +1,57 @@
+from pymystem3 import Mystem, MYSTEM_BIN
+from contextlib import contextmanager
+from queue import Queue
+from threading import Lock
+import os
+
+class MystemPool:
+    def __init__(self, size: int = 4):
+        if size < 1:
+            raise ValueError("Mystem pool size must be positive")
+        self.size = size
+        self.lock = Lock()
+        self._reset()
+
+    def _reset(self):
+        self.pid = os.getpid()
+        self.idle = Queue()
+        self.instances = []
+
+    @contextmanager
+    def acquire(self):
+        with self.lock:
+            if self.pid != os.getpid():
+                # forked worker: never talk to the parent's mystem pipes
+                self._reset()
+            if self.idle.empty() and len(self.instances) < self.size:
+                morph = Mystem()
+                self.instances.append(morph)
+                self.idle.put(morph)
+            idle = self.idle
+        morph = idle.get()
+        try:
+            yield morph
+        except Exception:
+            # the process may be left mid-response, restart it on next use
+            morph.close()
+            raise
+        finally:
+            idle.put(morph)
+
+    def analyze(self, text: str) -> list:
+        with self.acquire() as morph:
+            return morph.analyze(text)
+
+    def binary_version(self) -> str:
+        mystem_bin = os.environ.get("MYSTEM_BIN", MYSTEM_BIN)
+        try:
+            stat = os.stat(mystem_bin)
+        except OSError:
+            return mystem_bin
+        return f"{mystem_bin}:{stat.st_size}:{int(stat.st_mtime)}"
+
+    def close(self):
+        with self.lock:
+            for morph in self.instances:
+                morph.close()
+            self._reset()
\ No newline at end of file
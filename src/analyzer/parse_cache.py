@@ -0,0 +1,64 @@
+from collections import OrderedDict, namedtuple
+from threading import Lock
+
+ParsedForm = namedtuple("ParsedForm", ["lemma", "pos", "tag", "qualitative"])
+
+class ParseCache:
+    def __init__(self, maxsize: int = 200_000):
+        if maxsize < 1:
+            raise ValueError("Parse cache size must be positive")
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, morph, word: str) -> ParsedForm:
+        key = word.lower()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        parses = morph.parse(word)
+        best = parses[0]
+        entry = ParsedForm(
+            best.normal_form,
+            str(best.tag.POS or "UNKNOWN"),
+            str(best.tag),
+            any('Qual' in parsed.tag for parsed in parses)
+        )
+        with self.lock:
+            self.entries[key] = entry
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return entry
+
+    def resize(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError("Parse cache size must be positive")
+        with self.lock:
+            self.maxsize = maxsize
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0
+            }
+
+shared_parse_cache = ParseCache()
\ No newline at end of file
@@ -1,35 +1,49 @@
 from ..interface.morphological_analyzer import MorphologicalAnalyzer
-from nltk.tokenize import RegexpTokenizer
+from .parse_cache import ParseCache, shared_parse_cache
+from .morph_registry import shared_morph_registry
 import pymorphy2
-from collections import defaultdict
+from collections import Counter, defaultdict
+from typing import Iterator
+import re
+
+_TOKEN = re.compile(r'[\w-]+')
 
 class Pymorphy2Analyzer(MorphologicalAnalyzer):
-    def __init__(self):
-        self.morph = pymorphy2.MorphAnalyzer()
-        self.tokenizer = RegexpTokenizer(r'[\w-]+')
+    name = "pymorphy2"
+
+    def __init__(self, parse_cache: ParseCache = None):
+        self.morph = shared_morph_registry.get()
+        self.parse_cache = parse_cache or shared_parse_cache
+
+    def __reduce__(self):
+        return (self.__class__, ())
+
+    def cache_key(self) -> str:
+        meta = self.morph.dictionary.meta
+        return f"pymorphy2:{pymorphy2.__version__}:{meta.get('source_revision')}:{meta.get('compiled_at')}"
+
+    def tokens(self, text: str) -> Iterator[str]:
+        for match in _TOKEN.finditer(text):
+            token = match.group()
+            if not (token.isdigit() or token == '-'):
+                yield token
 
     def lemmatize(self, text: str):
-        tokens = self.tokenizer.tokenize(text)
-        tokens = [token for token in tokens if not (token.isdigit() or token == '-')]
-        return [(token, self.morph.parse(token)[0].normal_form) for token in tokens]
+        tokens = list(self.tokens(text))
+        lemmas = {form: self.parse_cache.parse(self.morph, form).lemma for form in dict.fromkeys(tokens)}
+        return [(token, lemmas[token]) for token in tokens]
 
+    # each distinct form is parsed once per document and weighted by its count
     def count_grammems(self, text: str):
-        tokens = self.tokenizer.tokenize(text)
-        tokens = [token for token in tokens if not (token.isdigit() or token == '-')]
         grammems_count = {}
-        for token in tokens:
-            parsed = self.morph.parse(token)[0]
-            pos = parsed.tag.POS or "UNKNOWN"
-            grammems_count[pos] = grammems_count.get(pos, 0) + 1
+        for form, count in Counter(self.tokens(text)).items():
+            pos = self.parse_cache.parse(self.morph, form).pos
+            grammems_count[pos] = grammems_count.get(pos, 0) + count
         return grammems_count
 
     def count_grammems_lemmas(self, text: str):
-        tokens = self.tokenizer.tokenize(text)
-        tokens = [token for token in tokens if not (token.isdigit() or token == '-')]
         grammems_count = defaultdict(dict)
-        for token in tokens:
-            parsed = self.morph.parse(token)[0]
-            pos = parsed.tag.POS or "UNKNOWN"
-            lemma = parsed.normal_form
-            grammems_count[pos][lemma] = grammems_count[pos].get(lemma, 0) + 1
+        for form, count in Counter(self.tokens(text)).items():
+            parsed = self.parse_cache.parse(self.morph, form)
+            grammems_count[parsed.pos][parsed.lemma] = grammems_count[parsed.pos].get(parsed.lemma, 0) + count
         return grammems_count
\ No newline at end of file
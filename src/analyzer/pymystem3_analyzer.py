@@ -1,26 +1,32 @@
 from ..interface.morphological_analyzer import MorphologicalAnalyzer
-from pymystem3 import Mystem
+from .mystem_pool import MystemPool
+import pymystem3
 import re
 from collections import defaultdict
 
 class Pymystem3Analyzer(MorphologicalAnalyzer):
-    def __init__(self):
+    name = "pymystem3"
+
+    def __init__(self, pool_size: int = 4):
         self.pos_regex = re.compile(r'^([A-Z]+)')
+        self.pool_size = pool_size
+        self.mystem_pool = MystemPool(pool_size)
+
+    def __reduce__(self):
+        return (self.__class__, (self.pool_size,))
 
-    def get_new_morph(self):
-        return Mystem()
+    def cache_key(self) -> str:
+        return f"pymystem3:{pymystem3.__version__}:{self.mystem_pool.binary_version()}"
 
     def lemmatize(self, text: str):
-        morph = self.get_new_morph()
-        analysis = morph.analyze(text)
+        analysis = self.mystem_pool.analyze(text)
         return [
             (entry["text"], entry["analysis"][0]["lex"] if entry["analysis"] else entry["text"])
             for entry in analysis if "analysis" in entry
         ]
 
     def count_grammems(self, text: str):
-        morph = self.get_new_morph()
-        analysis = morph.analyze(text)
+        analysis = self.mystem_pool.analyze(text)
         grammems_count = {}
         for entry in analysis:
             if "analysis" in entry:
@@ -34,8 +40,7 @@ class Pymystem3Analyzer(MorphologicalAnalyzer):
         return grammems_count
 
     def count_grammems_lemmas(self, text: str):
-        morph = self.get_new_morph()
-        analysis = morph.analyze(text)
+        analysis = self.mystem_pool.analyze(text)
         grammems_count = defaultdict(dict)
         for entry in analysis:
             if "analysis" in entry:
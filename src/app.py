@@ -1,14 +1,11 @@
 from .util.file_handler import FileHandler
 from .util.plotter import Plotter
-from .model.enums import PlotType
-from .operation.lemmatization import LemmatizationOperation
-from .operation.pos_count import POSCountOperation
-from .operation.pos_word_count import POSWordCountOperation
-from .operation.adjective_analysis import AdjectiveAnalysisOperation
-from .analyzer.pymorphy2_analyzer import Pymorphy2Analyzer
-from .analyzer.pymystem3_analyzer import Pymystem3Analyzer
-from .analyzer.adjective_analyzer.open_corpora_analyzer import OpenCorporaAdjectiveAnalyzer
-from .analyzer.adjective_analyzer.wiktionary_analyzer import WiktionaryAdjectiveAnalyzer
+from .model.enums import PlotType, PlotMode, ExecutionMode, OutputFormat
+from .model.settings import RunSettings
+from .util.analysis_cache import AnalysisCache
+from .model.partial_aggregate import PartialAggregate
+from .util.instrumentation import instrumentation
+from .analyzer.parse_cache import shared_parse_cache
 from pathlib import Path
 from typing import List, Tuple
 import os
@@ -17,6 +14,7 @@ class TextAnalyzerApp:
     def __init__(self):
         self.file_handler = FileHandler()
         self.plotter = Plotter()
+        self.settings = RunSettings()
 
     def select_operation(self):
         print("Доступные функции:")
@@ -24,28 +22,100 @@ class TextAnalyzerApp:
         print("2. Доля частей речи")
         print("3. Частота слов по частям речи")
         print("4. Доля качественных и относительных прилагательных")
+        print("5. Сравнение pymorphy2 и pymystem3")
         choice = input("Выберите номер функции: ").strip()
+        # operations and analyzers pull in pandas, scipy and the dictionaries, so they load only once chosen
         if choice == "1":
-            return LemmatizationOperation(self.file_handler, self.plotter)
+            from .operation.lemmatization import LemmatizationOperation
+            return LemmatizationOperation(self.file_handler, self.plotter, self.settings)
         elif choice == "2":
-            return POSCountOperation(self.file_handler, self.plotter)
+            from .operation.pos_count import POSCountOperation
+            return POSCountOperation(self.file_handler, self.plotter, self.settings)
         elif choice == "3":
-            return POSWordCountOperation(self.file_handler, self.plotter)
+            from .operation.pos_word_count import POSWordCountOperation
+            return POSWordCountOperation(self.file_handler, self.plotter, self.settings)
         elif choice == "4":
+            from .operation.adjective_analysis import AdjectiveAnalysisOperation
             adjective_analyzer = self.select_adjective_analyzer()
-            return AdjectiveAnalysisOperation(self.file_handler, self.plotter, adjective_analyzer)
+            return AdjectiveAnalysisOperation(self.file_handler, self.plotter, adjective_analyzer, self.settings)
+        elif choice == "5":
+            from .operation.analyzer_comparison import AnalyzerComparisonOperation
+            from .analyzer.pymorphy2_analyzer import Pymorphy2Analyzer
+            from .analyzer.pymystem3_analyzer import Pymystem3Analyzer
+            analyzers = [Pymorphy2Analyzer(), Pymystem3Analyzer(pool_size=self.settings.max_workers)]
+            return AnalyzerComparisonOperation(self.file_handler, self.plotter, analyzers, self.settings)
         else:
             raise ValueError("Invalid operation choice")
 
+    def select_execution_settings(self):
+        print("\nРежим выполнения:")
+        print("1. Потоки")
+        print("2. Процессы")
+        choice = input("Выберите номер режима: ").strip()
+        if choice == "1":
+            execution_mode = ExecutionMode.THREAD
+        elif choice == "2":
+            execution_mode = ExecutionMode.PROCESS
+        else:
+            raise ValueError("Invalid execution mode choice")
+        default_workers = RunSettings.default_workers()
+        workers = input(f"Введите количество рабочих (Enter — {default_workers}): ").strip()
+        if not workers:
+            max_workers = default_workers
+        elif workers.isdigit() and int(workers) > 0:
+            max_workers = int(workers)
+        else:
+            raise ValueError("Invalid number of workers")
+        cache_size = input("Введите размер кэша разбора слов (Enter — 200000): ").strip()
+        if not cache_size:
+            parse_cache_size = 200_000
+        elif cache_size.isdigit() and int(cache_size) > 0:
+            parse_cache_size = int(cache_size)
+        else:
+            raise ValueError("Invalid parse cache size")
+        use_cache = input("Использовать кэш результатов анализа на диске? (y/n, Enter — y): ").strip().lower()
+        if use_cache in ("", "y"):
+            cache_dir = "cache"
+            cache_size = input("Введите максимальный размер кэша в МБ (Enter — 2048): ").strip()
+            if not cache_size:
+                cache_max_size_mb = 2048
+            elif cache_size.isdigit() and int(cache_size) > 0:
+                cache_max_size_mb = int(cache_size)
+            else:
+                raise ValueError("Invalid cache size")
+        elif use_cache == "n":
+            cache_dir = None
+            cache_max_size_mb = 2048
+        else:
+            raise ValueError("Invalid cache choice")
+        incremental = input("Хранить агрегаты для инкрементального обновления? (y/n, Enter — n): ").strip().lower()
+        if incremental not in ("", "y", "n"):
+            raise ValueError("Invalid incremental update choice")
+        state_dir = "state" if incremental == "y" else None
+        memory_budget = input("Введите лимит памяти для частот лемм в МБ (Enter — без лимита): ").strip()
+        if not memory_budget:
+            memory_budget_mb = None
+        elif memory_budget.isdigit() and int(memory_budget) > 0:
+            memory_budget_mb = int(memory_budget)
+        else:
+            raise ValueError("Invalid memory budget")
+        metrics_path = input("Введите путь для сводки метрик (.json или .prom, Enter — без метрик): ").strip() or None
+        if metrics_path is not None and Path(metrics_path).suffix not in (".json", ".prom"):
+            raise ValueError("Metrics summary must be a .json or .prom file")
+        return RunSettings(execution_mode, max_workers, parse_cache_size, cache_dir, cache_max_size_mb,
+                           metrics_path=metrics_path, state_dir=state_dir, memory_budget_mb=memory_budget_mb)
+
     def select_analyzer(self):
         print("\nДоступные морфологические анализаторы:")
         print("1. pymorphy2")
         print("2. pymystem3")
         choice = input("Выберите номер анализатора: ").strip()
         if choice == "1":
+            from .analyzer.pymorphy2_analyzer import Pymorphy2Analyzer
             return Pymorphy2Analyzer()
         elif choice == "2":
-            return Pymystem3Analyzer()
+            from .analyzer.pymystem3_analyzer import Pymystem3Analyzer
+            return Pymystem3Analyzer(pool_size=self.settings.max_workers)
         else:
             raise ValueError("Invalid analyzer choice")
 
@@ -53,14 +123,39 @@ class TextAnalyzerApp:
         print("\nДоступные словари для анализа:")
         print("1. OpenCorpora")
         print("2. ВикиСловарь")
+        print("3. Офлайн-лексикон (python main.py build-lexicon)")
         choice = input("Выберите номер словаря: ").strip()
         if choice == "1":
+            from .analyzer.adjective_analyzer.open_corpora_analyzer import OpenCorporaAdjectiveAnalyzer
             return OpenCorporaAdjectiveAnalyzer()
         elif choice == "2":
-            return WiktionaryAdjectiveAnalyzer()
+            from .analyzer.adjective_analyzer.wiktionary_analyzer import WiktionaryAdjectiveAnalyzer
+            from .analyzer.adjective_analyzer.wiktionary_client import WiktionaryClient
+            from .analyzer.adjective_analyzer.classification_cache import ClassificationCache
+            cache = ClassificationCache(str(Path(self.settings.cache_dir) / "wiktionary.sqlite")) if self.settings.cache_dir else None
+            return WiktionaryAdjectiveAnalyzer(WiktionaryClient(concurrency=self.settings.max_workers), cache)
+        elif choice == "3":
+            from .analyzer.adjective_analyzer.lexicon_analyzer import LexiconAdjectiveAnalyzer
+            lexicon_path = input("Введите путь к лексикону (Enter — adjectives.lexicon): ").strip() or "adjectives.lexicon"
+            if not Path(lexicon_path).is_file():
+                raise ValueError(f"Lexicon not found: {lexicon_path}")
+            return LexiconAdjectiveAnalyzer(Path(lexicon_path))
         else:
             raise ValueError("Invalid adjective analyzer choice")
 
+    def select_output_format(self):
+        print("\nДоступные форматы таблиц:")
+        print("1. xlsx")
+        print("2. csv")
+        print("3. parquet")
+        print("4. feather")
+        choice = input("Выберите номер формата (Enter — xlsx): ").strip()
+        formats = {"": OutputFormat.XLSX, "1": OutputFormat.XLSX, "2": OutputFormat.CSV,
+                   "3": OutputFormat.PARQUET, "4": OutputFormat.FEATHER}
+        if choice not in formats:
+            raise ValueError("Invalid output format choice")
+        return formats[choice]
+
     def get_folder_path(self):
         folder_path = input("\nВведите полный путь к папке: ").strip()
         if not os.path.isdir(folder_path):
@@ -134,17 +229,90 @@ class TextAnalyzerApp:
         else:
             raise ValueError("Invalid plot type")
 
+    def select_plot_mode(self):
+        print("\nПостроение графиков:")
+        print("1. Сразу")
+        print("2. Параллельно в конце обработки")
+        print("3. Сохранить данные графиков и построить позже")
+        print("4. Не строить")
+        choice = input("Выберите номер режима (Enter — 1): ").strip()
+        modes = {"": PlotMode.IMMEDIATE, "1": PlotMode.IMMEDIATE, "2": PlotMode.PARALLEL,
+                 "3": PlotMode.DEFERRED, "4": PlotMode.SKIP}
+        if choice not in modes:
+            raise ValueError("Invalid plot mode choice")
+        return modes[choice]
+
+    def select_saved_aggregates(self, operation):
+        path = operation.aggregates_path()
+        if not path.exists():
+            return None
+        try:
+            saved = PartialAggregate.load(path, operation.settings)
+        except ValueError as e:
+            print(f"Сохранённые агрегаты не используются: {e}")
+            return None
+        years = saved.years()
+        if saved.operation != operation.name or not years:
+            return None
+        choice = input(
+            f"\nНайдены годовые агрегаты за {years[0]}–{years[-1]} (анализатор: {saved.analyzer_key}). "
+            "Построить отчёты по ним без повторного анализа? (y/n, Enter — n): "
+        ).strip().lower()
+        if choice == "y":
+            return saved
+        elif choice in ("", "n"):
+            return None
+        raise ValueError("Invalid saved aggregates choice")
+
+    def print_cache_stats(self):
+        stats = shared_parse_cache.stats()
+        if stats["hits"] + stats["misses"] == 0:
+            return
+        print(
+            f"Кэш разбора: {stats['size']}/{stats['maxsize']} форм, "
+            f"попаданий {stats['hits']}, промахов {stats['misses']}, "
+            f"доля попаданий {stats['hit_rate']:.1%}"
+        )
+
     def run(self):
         try:
+            self.settings = self.select_execution_settings()
+            shared_parse_cache.resize(self.settings.parse_cache_size)
             operation = self.select_operation()
-            analyzer = self.select_analyzer()
+            saved = self.select_saved_aggregates(operation)
+            analyzer = self.select_analyzer() if operation.requires_analyzer and saved is None else None
             plot_type = self.select_plot_type()
+            self.plotter.mode = self.select_plot_mode()
+            self.plotter.max_workers = self.settings.max_workers
+            self.file_handler.output_format = self.select_output_format()
+            if saved is not None:
+                # other period splits are summed from the stored year totals, the corpus is not read again
+                aggregate = operation.regroup_saved(saved, self.select_periods(saved.years()))
+                with self.file_handler.background_writer():
+                    operation.report(aggregate, plot_type)
+                    self.plotter.flush()
+                    operation.explore(aggregate, plot_type)
+                operation.discard(aggregate)
+                print("Обработка завершена.")
+                return
             folder_path = self.get_folder_path()
             years = self.get_available_years(folder_path)
             if not years:
                 raise ValueError("No valid year folders found in the provided directory.")
             periods = self.select_periods(years)
-            operation.execute(periods, folder_path, analyzer, plot_type)
+            if self.settings.metrics_path:
+                instrumentation.enable()
+            with self.file_handler.background_writer():
+                operation.execute(periods, folder_path, analyzer, plot_type)
+                self.plotter.flush()
+            self.print_cache_stats()
+            if self.settings.metrics_path:
+                instrumentation.finish_progress()
+                instrumentation.write_summary(Path(self.settings.metrics_path))
+                print(f"Сводка метрик сохранена в {self.settings.metrics_path}")
+            analysis_cache = AnalysisCache.from_settings(self.settings)
+            if analysis_cache is not None:
+                analysis_cache.prune()
             print("Обработка завершена.")
         except Exception as e:
             print(f"Ошибка: {e}")
\ No newline at end of file
@@ -0,0 +1,221 @@
+from .model.enums import PlotType, PlotMode, ExecutionMode, OutputFormat
+from .model.settings import RunSettings
+from .model.partial_aggregate import PartialAggregate
+from .util.file_handler import FileHandler
+from .util.plotter import Plotter
+from pathlib import Path
+from typing import List, Tuple
+import argparse
+import sys
+
+OPERATIONS = ["lemmatization", "pos_count", "pos_word_count", "adjective_analysis", "comparison"]
+ANALYZERS = ["pymorphy2", "pymystem3"]
+ADJECTIVE_DICTIONARIES = ["opencorpora", "wiktionary", "lexicon"]
+
+def create_analyzer(name: str, settings: RunSettings):
+    if name == "pymorphy2":
+        from .analyzer.pymorphy2_analyzer import Pymorphy2Analyzer
+        return Pymorphy2Analyzer()
+    elif name == "pymystem3":
+        from .analyzer.pymystem3_analyzer import Pymystem3Analyzer
+        return Pymystem3Analyzer(pool_size=settings.max_workers)
+    raise ValueError(f"Unknown analyzer: {name}")
+
+def create_adjective_analyzer(name: str, settings: RunSettings, lexicon_path: Path = Path("adjectives.lexicon")):
+    if name == "opencorpora":
+        from .analyzer.adjective_analyzer.open_corpora_analyzer import OpenCorporaAdjectiveAnalyzer
+        return OpenCorporaAdjectiveAnalyzer()
+    elif name == "wiktionary":
+        from .analyzer.adjective_analyzer.wiktionary_analyzer import WiktionaryAdjectiveAnalyzer
+        from .analyzer.adjective_analyzer.wiktionary_client import WiktionaryClient
+        from .analyzer.adjective_analyzer.classification_cache import ClassificationCache
+        cache = ClassificationCache(str(Path(settings.cache_dir) / "wiktionary.sqlite")) if settings.cache_dir else None
+        return WiktionaryAdjectiveAnalyzer(WiktionaryClient(concurrency=settings.max_workers), cache)
+    elif name == "lexicon":
+        from .analyzer.adjective_analyzer.lexicon_analyzer import LexiconAdjectiveAnalyzer
+        return LexiconAdjectiveAnalyzer(lexicon_path)
+    raise ValueError(f"Unknown adjective dictionary: {name}")
+
+def create_operation(name: str, file_handler: FileHandler, plotter: Plotter, settings: RunSettings,
+                     adjective_dictionary: str = "opencorpora", lexicon_path: Path = Path("adjectives.lexicon")):
+    if name == "lemmatization":
+        from .operation.lemmatization import LemmatizationOperation
+        return LemmatizationOperation(file_handler, plotter, settings)
+    elif name == "pos_count":
+        from .operation.pos_count import POSCountOperation
+        return POSCountOperation(file_handler, plotter, settings)
+    elif name == "pos_word_count":
+        from .operation.pos_word_count import POSWordCountOperation
+        return POSWordCountOperation(file_handler, plotter, settings)
+    elif name == "adjective_analysis":
+        from .operation.adjective_analysis import AdjectiveAnalysisOperation
+        adjective_analyzer = create_adjective_analyzer(adjective_dictionary, settings, lexicon_path)
+        return AdjectiveAnalysisOperation(file_handler, plotter, adjective_analyzer, settings)
+    elif name == "comparison":
+        from .operation.analyzer_comparison import AnalyzerComparisonOperation
+        analyzers = [create_analyzer(analyzer_name, settings) for analyzer_name in ANALYZERS]
+        return AnalyzerComparisonOperation(file_handler, plotter, analyzers, settings)
+    raise ValueError(f"Unknown operation: {name}")
+
+def available_years(folder_path: Path) -> List[str]:
+    return sorted(entry.name for entry in folder_path.iterdir() if entry.is_dir() and entry.name.isdigit())
+
+def parse_periods(values: List[str], folder_path: Path = None) -> List[Tuple[str, str]]:
+    if not values:
+        return [(year, year) for year in available_years(folder_path)] if folder_path is not None else []
+    periods = []
+    for value in values:
+        start, _, end = value.partition("-")
+        end = end or start
+        if not (start.isdigit() and end.isdigit()) or int(end) < int(start):
+            raise ValueError(f"Invalid period: {value}")
+        periods.append((start, end))
+    return periods
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    index, _, count = value.partition("/")
+    if not (index.isdigit() and count.isdigit()):
+        raise argparse.ArgumentTypeError("shard must look like INDEX/COUNT, e.g. 0/4")
+    return int(index), int(count)
+
+def shard_command(args):
+    shard_index, shard_count = args.shard
+    settings = RunSettings(ExecutionMode(args.mode), args.workers, cache_dir=args.cache_dir,
+                           shard_index=shard_index, shard_count=shard_count,
+                           memory_budget_mb=args.memory_budget_mb, spill_dir=args.spill_dir)
+    file_handler = FileHandler(args.results_dir)
+    operation = create_operation(args.operation, file_handler, Plotter(PlotMode.SKIP), settings)
+    analyzer = create_analyzer(args.analyzer, settings) if operation.requires_analyzer else None
+    # partials are always per year, the merge step decides how years are grouped into periods
+    years = operation.period_years(parse_periods(args.periods, args.corpus))
+    with file_handler.background_writer():
+        data = operation.process_files(years, args.corpus, analyzer)
+    partial = PartialAggregate(args.operation, operation.analyzer_key(analyzer), years, data, args.shard)
+    partial.save(args.output)
+    operation.discard(data)
+    print(f"Частичный агрегат {shard_index}/{shard_count} сохранён в {args.output}")
+
+def merge_command(args):
+    settings = RunSettings(max_workers=args.workers, cache_dir=args.cache_dir,
+                           memory_budget_mb=args.memory_budget_mb, spill_dir=args.spill_dir)
+    partials = [PartialAggregate.load(path, settings) for path in args.partials]
+    file_handler = FileHandler(args.results_dir, OutputFormat(f".{args.format}"))
+    plotter = Plotter(PlotMode(args.plot_mode), settings.max_workers)
+    operation = create_operation(partials[0].operation, file_handler, plotter, settings, args.adjective_dictionary,
+                                 args.adjective_lexicon)
+    merged = partials[0]
+    for partial in partials[1:]:
+        previous, merged = merged, merged.merge(partial, operation)
+        operation.discard(previous.data)
+        operation.discard(partial.data)
+    missing = merged.missing_shards()
+    if missing and not args.allow_missing:
+        raise ValueError(f"Missing shards: {missing}")
+    if args.output:
+        merged.save(args.output)
+    aggregate = operation.regroup_saved(merged, parse_periods(args.periods) or merged.periods)
+    with file_handler.background_writer():
+        operation.report(aggregate, PlotType(args.plot_type))
+        plotter.flush()
+    operation.discard(aggregate)
+    print(f"Объединено частичных агрегатов: {len(partials)}")
+
+def update_command(args):
+    settings = RunSettings(ExecutionMode(args.mode), args.workers, cache_dir=args.cache_dir, state_dir=args.state_dir,
+                           memory_budget_mb=args.memory_budget_mb, spill_dir=args.spill_dir)
+    file_handler = FileHandler(args.results_dir, OutputFormat(f".{args.format}"))
+    plotter = Plotter(PlotMode(args.plot_mode), settings.max_workers)
+    operation = create_operation(args.operation, file_handler, plotter, settings, args.adjective_dictionary,
+                                 args.adjective_lexicon)
+    analyzer = create_analyzer(args.analyzer, settings) if operation.requires_analyzer else None
+    periods = parse_periods(args.periods, args.corpus)
+    with file_handler.background_writer():
+        aggregate = operation.aggregate_periods(periods, args.corpus, analyzer)
+        operation.report(aggregate, PlotType(args.plot_type))
+        plotter.flush()
+    operation.discard(aggregate)
+
+def build_lexicon_command(args):
+    from .analyzer.adjective_analyzer.lexicon_builder import build_lexicon
+    stats = build_lexicon(args.output, args.wiktionary_dump)
+    print(
+        f"Лексикон сохранён в {args.output}: {stats['total']} прилагательных "
+        f"(OpenCorpora: {stats['opencorpora']}, ВикиСловарь: {stats['wiktionary']})"
+    )
+
+def add_memory_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--memory-budget-mb", type=int, help="spill lemma counts to disk above this size")
+    parser.add_argument("--spill-dir", help="directory for spilled runs, the system temp dir by default")
+
+def add_report_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--results-dir", default="results")
+    parser.add_argument("--format", choices=[output_format.value.lstrip(".") for output_format in OutputFormat],
+                        default="xlsx")
+    parser.add_argument("--plot-type", choices=[plot_type.value for plot_type in PlotType], default=PlotType.BAR.value)
+    parser.add_argument("--plot-mode", choices=[mode.value for mode in PlotMode], default=PlotMode.IMMEDIATE.value)
+    parser.add_argument("--adjective-dictionary", choices=ADJECTIVE_DICTIONARIES, default="opencorpora")
+    parser.add_argument("--adjective-lexicon", type=Path, default=Path("adjectives.lexicon"),
+                        help="lexicon file for --adjective-dictionary lexicon")
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Морфологический анализ корпуса по годам")
+    commands = parser.add_subparsers(dest="command")
+
+    shard = commands.add_parser("shard", help="analyze one shard of the corpus into a partial aggregate")
+    shard.add_argument("--operation", choices=OPERATIONS, required=True)
+    shard.add_argument("--analyzer", choices=ANALYZERS, default="pymorphy2")
+    shard.add_argument("--corpus", type=Path, required=True)
+    shard.add_argument("--periods", nargs="*", help="START-END or YEAR; every year separately by default")
+    shard.add_argument("--shard", type=parse_shard, default=(0, 1), help="INDEX/COUNT, files are split by path hash")
+    shard.add_argument("--output", type=Path, required=True)
+    shard.add_argument("--results-dir", default="results")
+    shard.add_argument("--mode", choices=[mode.value for mode in ExecutionMode], default=ExecutionMode.THREAD.value)
+    shard.add_argument("--workers", type=int, default=RunSettings.default_workers())
+    shard.add_argument("--cache-dir")
+    add_memory_arguments(shard)
+    shard.set_defaults(handler=shard_command)
+
+    merge = commands.add_parser(
+        "merge", help="combine partial or saved aggregates and write the reports for any period split"
+    )
+    merge.add_argument("partials", type=Path, nargs="+")
+    merge.add_argument("--periods", nargs="*", help="START-END or YEAR; every covered year separately by default")
+    merge.add_argument("--output", type=Path, help="also save the merged aggregate")
+    merge.add_argument("--allow-missing", action="store_true", help="report even if some shards are absent")
+    add_report_arguments(merge)
+    merge.add_argument("--workers", type=int, default=RunSettings.default_workers())
+    merge.add_argument("--cache-dir")
+    add_memory_arguments(merge)
+    merge.set_defaults(handler=merge_command)
+
+    update = commands.add_parser("update", help="analyze only new or changed files and rebuild the reports")
+    update.add_argument("--operation", choices=OPERATIONS[:-1], required=True)
+    update.add_argument("--analyzer", choices=ANALYZERS, default="pymorphy2")
+    update.add_argument("--corpus", type=Path, required=True)
+    update.add_argument("--periods", nargs="*", help="START-END or YEAR; every year separately by default")
+    update.add_argument("--state-dir", default="state")
+    add_report_arguments(update)
+    update.add_argument("--mode", choices=[mode.value for mode in ExecutionMode], default=ExecutionMode.THREAD.value)
+    update.add_argument("--workers", type=int, default=RunSettings.default_workers())
+    update.add_argument("--cache-dir")
+    add_memory_arguments(update)
+    update.set_defaults(handler=update_command)
+
+    lexicon = commands.add_parser("build-lexicon", help="precompute the offline adjective lexicon")
+    lexicon.add_argument("--output", type=Path, default=Path("adjectives.lexicon"))
+    lexicon.add_argument("--wiktionary-dump", type=Path,
+                         help="ruwiktionary pages-articles .xml or .xml.bz2; its classifications override OpenCorpora")
+    lexicon.set_defaults(handler=build_lexicon_command)
+    return parser
+
+def main(argv: List[str] = None):
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        from .app import TextAnalyzerApp
+        TextAnalyzerApp().run()
+        return
+    try:
+        args.handler(args)
+    except Exception as e:
+        print(f"Ошибка: {e}")
+        sys.exit(1)
\ No newline at end of file
@@ -1,6 +1,10 @@
 from abc import ABC, abstractmethod
+from typing import Dict, Iterable
 
 class AdjectiveAnalyzer(ABC):
     @abstractmethod
     def get_qualitative_or_relative(self, lemma: str) -> str:
-        pass
\ No newline at end of file
+        pass
+
+    def classify_many(self, lemmas: Iterable[str]) -> Dict[str, str]:
+        return {lemma: self.get_qualitative_or_relative(lemma) for lemma in dict.fromkeys(lemmas)}
\ No newline at end of file
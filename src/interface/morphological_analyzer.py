@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Iterable, Iterator
 
 class MorphologicalAnalyzer(ABC):
     @abstractmethod
@@ -11,4 +13,28 @@ class MorphologicalAnalyzer(ABC):
 
     @abstractmethod
     def count_grammems_lemmas(self, text: str):
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def cache_key(self) -> str:
+        pass
+
+    def lemmatize_stream(self, chunks: Iterable[str]) -> Iterator[tuple]:
+        for chunk in chunks:
+            yield from self.lemmatize(chunk)
+
+    def count_grammems_stream(self, chunks: Iterable[str]):
+        grammems_count = {}
+        for chunk in chunks:
+            for pos, count in self.count_grammems(chunk).items():
+                grammems_count[pos] = grammems_count.get(pos, 0) + count
+        return grammems_count
+
+    def count_grammems_lemmas_stream(self, chunks: Iterable[str]):
+        grammems_count = defaultdict(dict)
+        for chunk in chunks:
+            for pos, lemma_counts in self.count_grammems_lemmas(chunk).items():
+                pos_counts = grammems_count[pos]
+                for lemma, count in lemma_counts.items():
+                    pos_counts[lemma] = pos_counts.get(lemma, 0) + count
+        return grammems_count
\ No newline at end of file
@@ -1,9 +1,218 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
 from ..model.enums import PlotType
-from typing import List, Tuple
+from ..util.instrumentation import instrumentation, token_count
+from ..util.file_handler import FileReadError
+from ..util.incremental_store import IncrementalStore
+from ..model.partial_aggregate import PartialAggregate
+from ..util.worker_pool import WorkerPool
+from threading import Lock
+from types import GeneratorType
+from typing import Dict, List, Tuple
+import os
+import time
+import zlib
 
 class TextOperation(ABC):
+    name = None
+    requires_analyzer = True
+
     @abstractmethod
     def execute(self, periods: List[Tuple[str, str]], folder_path: Path, analyzer, plot_type: PlotType):
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def merge_aggregates(self, left, right):
+        pass
+
+    @abstractmethod
+    def report(self, aggregate, plot_type: PlotType):
+        pass
+
+    @abstractmethod
+    def new_aggregate(self):
+        pass
+
+    @abstractmethod
+    def add_record(self, aggregate, period: Tuple[str, str], record, sign: int = 1):
+        pass
+
+    @abstractmethod
+    def regroup(self, aggregate, periods: List[Tuple[str, str]]):
+        pass
+
+    @abstractmethod
+    def covered_periods(self, aggregate) -> List[Tuple[str, str]]:
+        pass
+
+    def forget_file(self, file_path: Path):
+        pass
+
+    def explore(self, aggregate, plot_type: PlotType):
+        pass
+
+    def discard(self, aggregate):
+        # called once an aggregate is no longer needed, releases whatever it keeps outside memory
+        pass
+
+    def analyzer_key(self, analyzer) -> str:
+        return analyzer.cache_key()
+
+    @staticmethod
+    def period_years(periods: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        years = {year for start, end in periods for year in range(int(start), int(end) + 1)}
+        return [(str(year), str(year)) for year in sorted(years)]
+
+    def aggregates_path(self) -> Path:
+        return self.file_handler.results_dir / "aggregates" / f"{self.name}.bin"
+
+    def in_shard(self, relative_path: str) -> bool:
+        if self.settings.shard_count == 1:
+            return True
+        # crc32 is stable across processes and machines, unlike hash()
+        return zlib.crc32(relative_path.encode("utf-8")) % self.settings.shard_count == self.settings.shard_index
+
+    def year_entries(self, folder_path: Path, year) -> List[Tuple[Path, int]]:
+        year_folder = folder_path / str(year)
+        if not year_folder.is_dir():
+            return []
+        entries = []
+        # one directory pass yields names and sizes together, no glob per suffix and no stat per path later
+        with os.scandir(year_folder) as scan:
+            for entry in scan:
+                if entry.name.lower().endswith((".txt", ".xml")) and entry.is_file() and self.in_shard(f"{year}/{entry.name}"):
+                    entries.append((Path(entry.path), entry.stat().st_size))
+        return sorted(entries)
+
+    def year_files(self, folder_path: Path, year) -> List[Path]:
+        return [file_path for file_path, _ in self.year_entries(folder_path, year)]
+
+    def schedule(self, periods: List[Tuple[str, str]], folder_path: Path) -> Dict[Path, Tuple[str, str]]:
+        # the whole run is one queue ordered largest first: big files start early and small ones fill the tail,
+        # whichever period they belong to
+        tasks = [
+            (size, file_path, (start, end))
+            for start, end in periods
+            for year in range(int(start), int(end) + 1)
+            for file_path, size in self.year_entries(folder_path, year)
+        ]
+        tasks.sort(key=lambda task: task[0], reverse=True)
+        return {file_path: period for _, file_path, period in tasks}
+
+    def analyzed_files(self, pool: WorkerPool, periods: List[Tuple[str, str]], folder_path: Path):
+        files = self.schedule(periods, folder_path)
+        for file_path, result in pool.map_unordered(files):
+            yield files[file_path], result
+
+    def corpus_files(self, folder_path: Path) -> Dict[str, Tuple[str, Path]]:
+        years = sorted(entry.name for entry in folder_path.iterdir() if entry.is_dir() and entry.name.isdigit())
+        return {
+            f"{year}/{file_path.name}": (year, file_path)
+            for year in years
+            for file_path in self.year_files(folder_path, year)
+        }
+
+    def aggregate_periods(self, periods: List[Tuple[str, str]], folder_path: Path, analyzer):
+        # analysis always aggregates per year; the year totals are kept so other period splits need no re-analysis
+        years = self.period_years(periods)
+        if self.settings.state_dir is None:
+            aggregate = self.process_files(years, folder_path, analyzer)
+        else:
+            aggregate = self.update_incremental(folder_path, analyzer)
+        # incremental totals hold every year of the corpus, not just the selected ones
+        covered = self.covered_periods(aggregate)
+        PartialAggregate(self.name, self.analyzer_key(analyzer), covered, aggregate).save(self.aggregates_path())
+        regrouped = self.regroup(aggregate, periods)
+        self.discard(aggregate)
+        return regrouped
+
+    def regroup_saved(self, partial: PartialAggregate, periods: List[Tuple[str, str]]):
+        if partial.operation != self.name:
+            raise ValueError(f"Saved aggregates belong to {partial.operation}, not {self.name}")
+        partial.check_covers(periods)
+        regrouped = self.regroup(partial.data, periods)
+        self.discard(partial.data)
+        return regrouped
+
+    def update_incremental(self, folder_path: Path, analyzer):
+        store = IncrementalStore(self.settings.state_dir, self.name, analyzer.cache_key())
+        try:
+            changes = store.scan(self.corpus_files(folder_path))
+            aggregate = store.aggregate(self.settings)
+            if aggregate is None:
+                aggregate = self.new_aggregate()
+            for relative_path, _, _, size, mtime_ns, _ in changes.touched:
+                store.touch(relative_path, size, mtime_ns)
+            # old versions of changed files and removed files are taken out of the year totals first
+            for relative_path in [entry[0] for entry in changes.changed] + changes.removed:
+                year, record = store.record(relative_path)
+                self.add_record(aggregate, (year, year), record, -1)
+            for relative_path in changes.removed:
+                store.delete_record(relative_path)
+            with WorkerPool(self.process_file, analyzer, self.settings.execution_mode, self.max_workers) as pool:
+                largest_first = sorted(changes.to_analyze(), key=lambda entry: entry[3], reverse=True)
+                entries = {entry[2]: entry for entry in largest_first}
+                for file_path, record in pool.map_unordered(entries):
+                    relative_path, year, _, size, mtime_ns, digest = entries[file_path]
+                    with instrumentation.stage("merge"):
+                        self.add_record(aggregate, (year, year), record)
+                    store.put_record(relative_path, year, size, mtime_ns, digest, record)
+            store.put_aggregate(aggregate)
+            store.commit()
+        except BaseException:
+            store.rollback()
+            raise
+        finally:
+            store.close()
+        for relative_path in changes.removed:
+            self.forget_file(folder_path / relative_path)
+        print(
+            f"Новых файлов: {len(changes.added)}, изменённых: {len(changes.changed)}, "
+            f"удалённых: {len(changes.removed)}, без изменений: {changes.unchanged}"
+        )
+        return aggregate
+
+    def analyze_file(self, file_path: Path, analyzer, method: str):
+        def compute():
+            if not self.is_streamed(file_path):
+                text = self.file_handler.read_text_file(file_path)
+                with instrumentation.stage("analyze"):
+                    return getattr(analyzer, method)(text)
+            # reading is interleaved with analysis here, so both count as analyze time
+            with instrumentation.stage("analyze"):
+                chunks = self.file_handler.iter_text_chunks(file_path, self.settings.chunk_chars)
+                result = getattr(analyzer, f"{method}_stream")(chunks)
+                return list(result) if isinstance(result, GeneratorType) else result
+
+        if not instrumentation.enabled:
+            return self.run_analysis(file_path, analyzer, method, compute)
+        started = time.perf_counter()
+        result = self.run_analysis(file_path, analyzer, method, compute)
+        instrumentation.record_file(file_path, time.perf_counter() - started, token_count(result))
+        return result
+
+    def is_streamed(self, file_path: Path) -> bool:
+        try:
+            size = file_path.stat().st_size
+        except OSError as e:
+            raise FileReadError(f"Error reading {file_path}: {e}") from e
+        return size > self.settings.stream_threshold_mb * 1024 * 1024
+
+    def run_analysis(self, file_path: Path, analyzer, method: str, compute):
+        try:
+            if self.analysis_cache is None:
+                return compute()
+            return self.analysis_cache.get_or_compute(file_path, analyzer, method, compute)
+        except FileReadError as e:
+            # an unreadable file counts as empty; counts of a partly read one are dropped before they reach the cache
+            print(e)
+            return getattr(analyzer, method)("")
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("lock", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = Lock()
\ No newline at end of file
@@ -10,4 +10,20 @@ class AdjectiveAnalyzerChoice(Enum):
 
 class PlotType(Enum):
     BAR = "bar"
-    LINE = "line"
\ No newline at end of file
+    LINE = "line"
+
+class PlotMode(Enum):
+    IMMEDIATE = "immediate"
+    PARALLEL = "parallel"
+    DEFERRED = "deferred"
+    SKIP = "skip"
+
+class ExecutionMode(Enum):
+    THREAD = "thread"
+    PROCESS = "process"
+
+class OutputFormat(Enum):
+    XLSX = ".xlsx"
+    CSV = ".csv"
+    PARQUET = ".parquet"
+    FEATHER = ".feather"
\ No newline at end of file
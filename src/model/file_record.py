@@ -0,0 +1,41 @@
+class FileRecord:
+    def __init__(self, token_count: int = 0, pos_counts: dict = None, pos_lemma_counts: dict = None):
+        self.token_count = token_count
+        self.pos_counts = pos_counts if pos_counts is not None else {}
+        self.pos_lemma_counts = pos_lemma_counts if pos_lemma_counts is not None else {}
+
+    @classmethod
+    def from_grammems_lemmas(cls, grammems: dict, keep_lemmas: bool = True) -> "FileRecord":
+        pos_counts = {grammem: sum(lemma_counts.values()) for grammem, lemma_counts in grammems.items()}
+        pos_lemma_counts = {grammem: dict(lemma_counts) for grammem, lemma_counts in grammems.items()} if keep_lemmas else {}
+        return cls(sum(pos_counts.values()), pos_counts, pos_lemma_counts)
+
+    def merge(self, other: "FileRecord"):
+        self.token_count += other.token_count
+        for grammem, count in other.pos_counts.items():
+            self.pos_counts[grammem] = self.pos_counts.get(grammem, 0) + count
+        for grammem, lemma_counts in other.pos_lemma_counts.items():
+            target = self.pos_lemma_counts.setdefault(grammem, {})
+            for lemma, count in lemma_counts.items():
+                target[lemma] = target.get(lemma, 0) + count
+        return self
+
+    def subtract(self, other: "FileRecord"):
+        self.token_count -= other.token_count
+        for grammem, count in other.pos_counts.items():
+            remaining = self.pos_counts.get(grammem, 0) - count
+            if remaining:
+                self.pos_counts[grammem] = remaining
+            else:
+                self.pos_counts.pop(grammem, None)
+        for grammem, lemma_counts in other.pos_lemma_counts.items():
+            target = self.pos_lemma_counts.setdefault(grammem, {})
+            for lemma, count in lemma_counts.items():
+                remaining = target.get(lemma, 0) - count
+                if remaining:
+                    target[lemma] = remaining
+                else:
+                    target.pop(lemma, None)
+            if not target:
+                del self.pos_lemma_counts[grammem]
+        return self
\ No newline at end of file
@@ -0,0 +1,73 @@
+from .lemma_matrix import LemmaCountMatrix
+from bisect import bisect_left
+from typing import List
+import numpy as np
+
+class LemmaIndex:
+    PREFIX_END = "\U0010ffff"
+
+    def __init__(self, lemma_counts: LemmaCountMatrix):
+        self.periods = list(lemma_counts.periods)
+        self.names = {}
+        self.counts = {}
+        self.totals = {}
+        self.ranking = {}
+        for pos in lemma_counts.grammems():
+            columns, counts = lemma_counts.lemma_columns(pos)
+            if not len(columns):
+                continue
+            names = lemma_counts.lemma_names(columns)
+            order = sorted(range(len(names)), key=names.__getitem__)
+            # one contiguous row per lemma in name order: prefix matches are a slice, lookups a binary search
+            self.names[pos] = [names[i] for i in order]
+            self.counts[pos] = np.ascontiguousarray(counts.T[order])
+            self.totals[pos] = self.counts[pos].sum(axis=1)
+            self.ranking[pos] = np.argsort(-self.totals[pos], kind="stable")
+
+    def grammems(self) -> List[str]:
+        return sorted(self.names)
+
+    def __contains__(self, pos: str) -> bool:
+        return pos in self.names
+
+    def _prefix_range(self, pos: str, prefix: str):
+        names = self.names[pos]
+        return bisect_left(names, prefix), bisect_left(names, prefix + self.PREFIX_END)
+
+    def vector(self, pos: str, lemma: str) -> np.ndarray:
+        if pos not in self.names:
+            return None
+        names = self.names[pos]
+        position = bisect_left(names, lemma)
+        if position == len(names) or names[position] != lemma:
+            return None
+        return self.counts[pos][position]
+
+    def top(self, pos: str, k: int = 10, prefix: str = "") -> List[str]:
+        if pos not in self.names:
+            return []
+        names = self.names[pos]
+        if not prefix:
+            return [names[i] for i in self.ranking[pos][:k]]
+        start, end = self._prefix_range(pos, prefix)
+        totals = self.totals[pos][start:end]
+        if len(totals) > k:
+            candidates = np.argpartition(-totals, k - 1)[:k]
+        else:
+            candidates = np.arange(len(totals))
+        # most frequent first, ties in name order
+        candidates = candidates[np.lexsort((candidates, -totals[candidates]))]
+        return [names[start + i] for i in candidates]
+
+    def count_prefix(self, pos: str, prefix: str) -> int:
+        if pos not in self.names:
+            return 0
+        start, end = self._prefix_range(pos, prefix)
+        return end - start
+
+    def suggest(self, pos: str, lemma: str, k: int = 5) -> List[str]:
+        # lemmas sharing the longest prefix of a mistyped word
+        prefix = lemma
+        while prefix and not self.count_prefix(pos, prefix):
+            prefix = prefix[:-1]
+        return self.top(pos, k, prefix) if prefix else []
\ No newline at end of file
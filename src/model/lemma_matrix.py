@@ -0,0 +1,223 @@
+from ..util.spill_store import SpillStore
+from array import array
+from typing import BinaryIO, Dict, List, Tuple
+import numpy as np
+import pickle
+import sys
+from scipy import sparse
+
+class Vocabulary:
+    # dict slot, list slot and id object per entry, on top of the string itself
+    ENTRY_OVERHEAD = 100
+
+    def __init__(self):
+        self.ids = {}
+        self.items = []
+        self.nbytes = 0
+
+    def intern(self, item: str) -> int:
+        item_id = self.ids.get(item)
+        if item_id is None:
+            item_id = self.ids[item] = len(self.items)
+            self.items.append(item)
+            self.nbytes += sys.getsizeof(item) + self.ENTRY_OVERHEAD
+        return item_id
+
+    def get(self, item: str) -> int:
+        return self.ids.get(item)
+
+    def __len__(self):
+        return len(self.items)
+
+    def copy(self) -> "Vocabulary":
+        vocabulary = Vocabulary()
+        vocabulary.ids = dict(self.ids)
+        vocabulary.items = list(self.items)
+        vocabulary.nbytes = self.nbytes
+        return vocabulary
+
+# array typecode and NumPy dtype of the pending buffers must have the same width on every platform,
+# 'l' and np.int_ differ on Windows
+BUFFER_TYPECODE = 'q'
+BUFFER_DTYPE = np.int64
+
+def _new_buffers():
+    return array(BUFFER_TYPECODE), array(BUFFER_TYPECODE), array(BUFFER_TYPECODE)
+
+class LemmaCountMatrix:
+    COMPACT_THRESHOLD = 1_000_000
+    # counts below this are never spilled, a vocabulary that fills the budget alone must not cause a spill per file
+    MIN_SPILL_BYTES = 8 * 1024 * 1024
+    RUNTIME_FIELDS = ("pending", "matrices", "spilled", "memory_budget_mb", "spill_dir")
+
+    def __init__(self, periods: List[Tuple[str, str]], memory_budget_mb: int = None, spill_dir: str = None):
+        self.periods = list(periods)
+        self.period_index = {period: i for i, period in enumerate(self.periods)}
+        self.lemmas = Vocabulary()
+        self.pos_tags = Vocabulary()
+        self.pending = {}
+        self.matrices = {}
+        self.memory_budget_mb = memory_budget_mb
+        self.spill_dir = spill_dir
+        self.spilled = None
+
+    def like(self, periods: List[Tuple[str, str]]) -> "LemmaCountMatrix":
+        return LemmaCountMatrix(periods, self.memory_budget_mb, self.spill_dir)
+
+    def add_period(self, period: Tuple[str, str]):
+        if period not in self.period_index:
+            self.period_index[period] = len(self.periods)
+            self.periods.append(period)
+
+    def add(self, period: Tuple[str, str], pos_lemma_counts: Dict[str, Dict[str, int]], sign: int = 1):
+        row = self.period_index[period]
+        intern = self.lemmas.intern
+        for pos, lemma_counts in pos_lemma_counts.items():
+            pos_id = self.pos_tags.intern(pos)
+            rows, cols, counts = self.pending.setdefault(pos_id, _new_buffers())
+            for lemma, count in lemma_counts.items():
+                rows.append(row)
+                cols.append(intern(lemma))
+                counts.append(sign * count)
+            if len(counts) >= self.COMPACT_THRESHOLD:
+                self._compact(pos_id)
+        self._check_budget()
+
+    def merge(self, other: "LemmaCountMatrix") -> "LemmaCountMatrix":
+        # ids differ between matrices, so rows and columns are remapped through the period and lemma names
+        row_map = np.array([self.period_index[period] for period in other.periods], dtype=BUFFER_DTYPE)
+        col_map = np.array([self.lemmas.intern(lemma) for lemma in other.lemmas.items], dtype=BUFFER_DTYPE)
+        for pos in other.grammems():
+            matrix = other.matrix(pos).tocoo()
+            pos_id = self.pos_tags.intern(pos)
+            rows, cols, counts = self.pending.setdefault(pos_id, _new_buffers())
+            rows.frombytes(row_map[matrix.row].tobytes())
+            cols.frombytes(col_map[matrix.col].tobytes())
+            counts.frombytes(matrix.data.astype(BUFFER_DTYPE).tobytes())
+            if len(counts) >= self.COMPACT_THRESHOLD:
+                self._compact(pos_id)
+            self._check_budget()
+        return self
+
+    def count_bytes(self) -> int:
+        pending = sum(len(values) * values.itemsize for arrays in self.pending.values() for values in arrays)
+        return pending + sum(
+            matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes for matrix in self.matrices.values()
+        )
+
+    def _check_budget(self):
+        if self.memory_budget_mb is None:
+            return
+        # ids must stay stable, so the vocabulary stays in memory and only leaves less room for the counts
+        vocabulary_bytes = self.lemmas.nbytes + self.pos_tags.nbytes
+        allowance = max(self.memory_budget_mb * 1024 * 1024 - vocabulary_bytes, self.MIN_SPILL_BYTES)
+        if self.count_bytes() > allowance:
+            self.spill()
+
+    def spill(self):
+        # lemma and period ids never change, so runs stay valid while the vocabulary keeps growing
+        if self.spilled is None:
+            self.spilled = SpillStore(self.spill_dir)
+        for pos_id in set(self.pending) | set(self.matrices):
+            self._compact(pos_id)
+            matrix = self.matrices.pop(pos_id).tocoo()
+            if matrix.nnz:
+                self.spilled.write(pos_id, matrix.row, matrix.col, matrix.data)
+
+    def _compact(self, pos_id: int):
+        rows, cols, counts = self.pending.pop(pos_id, (None, None, None))
+        shape = (len(self.periods), len(self.lemmas))
+        matrix = self.matrices.get(pos_id)
+        if matrix is None:
+            matrix = sparse.csr_matrix(shape, dtype=np.int64)
+        elif matrix.shape != shape:
+            matrix.resize(shape)
+        if counts:
+            matrix = matrix + sparse.coo_matrix(
+                (
+                    np.frombuffer(counts, dtype=BUFFER_DTYPE),
+                    (np.frombuffer(rows, dtype=BUFFER_DTYPE), np.frombuffer(cols, dtype=BUFFER_DTYPE))
+                ),
+                shape=shape
+            ).tocsr()
+            # subtracted records leave explicit zeros behind, which would still count as present lemmas
+            matrix.eliminate_zeros()
+        self.matrices[pos_id] = matrix
+
+    def regroup(self, periods: List[Tuple[str, str]], members: List[List[Tuple[str, str]]]) -> "LemmaCountMatrix":
+        # row i of the result is the sum of the rows listed in members[i], one sparse product per part of speech
+        regrouped = self.like(periods)
+        regrouped.lemmas = self.lemmas.copy()
+        regrouped.pos_tags = self.pos_tags.copy()
+        rows, cols = [], []
+        for row, member_periods in enumerate(members):
+            for period in member_periods:
+                if period in self.period_index:
+                    rows.append(row)
+                    cols.append(self.period_index[period])
+        grouping = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows, cols)), shape=(len(periods), len(self.periods))
+        )
+        for pos_id, pos in enumerate(self.pos_tags.items):
+            regrouped.matrices[pos_id] = (grouping @ self.matrix(pos)).tocsr()
+            regrouped._check_budget()
+        return regrouped
+
+    def grammems(self) -> List[str]:
+        return list(self.pos_tags.items)
+
+    def matrix(self, pos: str) -> sparse.csr_matrix:
+        pos_id = self.pos_tags.get(pos)
+        if pos_id is None:
+            return sparse.csr_matrix((len(self.periods), len(self.lemmas)), dtype=np.int64)
+        self._compact(pos_id)
+        matrix = self.matrices[pos_id]
+        if self.spilled is not None:
+            # spilled runs are merged on every access and never cached, only one part of speech is in memory at a time
+            shape = matrix.shape
+            for rows, cols, counts in self.spilled.runs(pos_id):
+                matrix = matrix + sparse.coo_matrix((counts, (rows, cols)), shape=shape).tocsr()
+            matrix.eliminate_zeros()
+        return matrix
+
+    def lemma_columns(self, pos: str) -> Tuple[np.ndarray, np.ndarray]:
+        matrix = self.matrix(pos)
+        columns = np.flatnonzero(matrix.getnnz(axis=0))
+        return columns, matrix[:, columns].toarray()
+
+    def lemma_names(self, columns: np.ndarray) -> List[str]:
+        items = self.lemmas.items
+        return [items[column] for column in columns]
+
+    def close(self):
+        if self.spilled is not None:
+            self.spilled.close()
+            self.spilled = None
+
+    def write_sections(self, stream: BinaryIO):
+        # saved through aggregate_file: the header first, then one part of speech at a time;
+        # the memory settings belong to the run that loads the file, not to the one that wrote it
+        header = {key: value for key, value in self.__dict__.items() if key not in self.RUNTIME_FIELDS}
+        pickle.dump(header, stream, protocol=pickle.HIGHEST_PROTOCOL)
+        for pos in self.pos_tags.items:
+            matrix = self.matrix(pos)
+            for values in (matrix.indptr, matrix.indices, matrix.data):
+                np.lib.format.write_array(stream, values)
+
+    def read_sections(self, stream: BinaryIO, settings=None):
+        self.__dict__.update(pickle.load(stream))
+        self.pending = {}
+        self.matrices = {}
+        self.spilled = None
+        self.memory_budget_mb = settings.memory_budget_mb if settings is not None else None
+        self.spill_dir = settings.spill_dir if settings is not None else None
+        shape = (len(self.periods), len(self.lemmas))
+        for pos_id in range(len(self.pos_tags)):
+            indptr, indices, data = (np.lib.format.read_array(stream) for _ in range(3))
+            self.matrices[pos_id] = sparse.csr_matrix((data, indices, indptr), shape=shape)
+            self._check_budget()
+
+    def __getstate__(self):
+        if self.spilled is not None:
+            raise TypeError("Spilled lemma counts are saved with aggregate_file.dump, not pickled")
+        return self.__dict__
\ No newline at end of file
@@ -0,0 +1,88 @@
+from ..util import aggregate_file
+from pathlib import Path
+from typing import Dict, List, Tuple
+import os
+import tempfile
+import time
+
+class PartialAggregate:
+    FORMAT_VERSION = 4
+    MAGIC = b"TAPARTIAL"
+
+    def __init__(self, operation: str, analyzer_key: str, periods: List[Tuple[str, str]], data,
+                 shard: Tuple[int, int] = (0, 1)):
+        self.operation = operation
+        self.analyzer_key = analyzer_key
+        self.coverage = {period: [tuple(shard)] for period in periods}
+        self.data = data
+        self.created_at = time.time()
+
+    @property
+    def periods(self) -> List[Tuple[str, str]]:
+        return sorted(self.coverage, key=lambda x: x[0])
+
+    def years(self) -> List[str]:
+        return [start for start, _ in self.periods]
+
+    def check_covers(self, periods: List[Tuple[str, str]]):
+        # data is keyed by single years, any period made of covered years can be summed from it
+        missing = sorted({
+            str(year) for start, end in periods for year in range(int(start), int(end) + 1)
+        } - {start for start, end in self.coverage if start == end})
+        if missing:
+            raise ValueError(f"Years {', '.join(missing)} are not in the saved aggregates")
+
+    def save(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        header = f"{self.FORMAT_VERSION}\n".encode("ascii")
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.MAGIC + header)
+                aggregate_file.dump(self.__dict__, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: Path, settings=None) -> "PartialAggregate":
+        with open(path, "rb") as f:
+            if f.read(len(cls.MAGIC)) != cls.MAGIC:
+                raise ValueError(f"{path} is not a partial aggregate")
+            header = f.readline(16).rstrip(b"\n")
+            if header != str(cls.FORMAT_VERSION).encode("ascii"):
+                raise ValueError(
+                    f"{path} has format version {header.decode('ascii', 'replace')}, expected {cls.FORMAT_VERSION}"
+                )
+            partial = cls.__new__(cls)
+            partial.__dict__.update(aggregate_file.load(f, settings))
+        return partial
+
+    def merge(self, other: "PartialAggregate", operation) -> "PartialAggregate":
+        if (self.operation, self.analyzer_key) != (other.operation, other.analyzer_key):
+            raise ValueError(
+                f"Cannot merge {other.operation} ({other.analyzer_key}) into {self.operation} ({self.analyzer_key})"
+            )
+        coverage = {period: list(shards) for period, shards in self.coverage.items()}
+        for period, shards in other.coverage.items():
+            target = coverage.setdefault(period, [])
+            # the same shard of a period twice would count every file in it twice
+            if set(target) & set(shards):
+                raise ValueError(f"Period {period} shard {sorted(set(target) & set(shards))} is merged twice")
+            target.extend(shards)
+        merged = PartialAggregate(self.operation, self.analyzer_key, [], operation.merge_aggregates(self.data, other.data))
+        merged.coverage = coverage
+        return merged
+
+    def missing_shards(self) -> Dict[Tuple[str, str], List[Tuple[int, int]]]:
+        missing = {}
+        for period, shards in self.coverage.items():
+            for count in {count for _, count in shards}:
+                present = {index for index, shard_count in shards if shard_count == count}
+                absent = [(index, count) for index in range(count) if index not in present]
+                if absent:
+                    missing.setdefault(period, []).extend(absent)
+        return missing
\ No newline at end of file
@@ -0,0 +1,39 @@
+from .enums import ExecutionMode
+import os
+
+class RunSettings:
+    def __init__(self, execution_mode: ExecutionMode = ExecutionMode.THREAD, max_workers: int = 8,
+                 parse_cache_size: int = 200_000, cache_dir: str = None, cache_max_size_mb: int = 2048,
+                 cache_max_age_days: float = None, stream_threshold_mb: int = 64, chunk_chars: int = 1_000_000,
+                 metrics_path: str = None, shard_index: int = 0, shard_count: int = 1, state_dir: str = None,
+                 memory_budget_mb: int = None, spill_dir: str = None):
+        if max_workers < 1:
+            raise ValueError("max_workers must be positive")
+        if parse_cache_size < 1:
+            raise ValueError("parse_cache_size must be positive")
+        if cache_max_size_mb < 1:
+            raise ValueError("cache_max_size_mb must be positive")
+        if chunk_chars < 1:
+            raise ValueError("chunk_chars must be positive")
+        if shard_count < 1 or not 0 <= shard_index < shard_count:
+            raise ValueError("shard_index must be in [0, shard_count)")
+        if memory_budget_mb is not None and memory_budget_mb < 1:
+            raise ValueError("memory_budget_mb must be positive")
+        self.execution_mode = execution_mode
+        self.max_workers = max_workers
+        self.parse_cache_size = parse_cache_size
+        self.cache_dir = cache_dir
+        self.cache_max_size_mb = cache_max_size_mb
+        self.cache_max_age_days = cache_max_age_days
+        self.stream_threshold_mb = stream_threshold_mb
+        self.chunk_chars = chunk_chars
+        self.metrics_path = metrics_path
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.state_dir = state_dir
+        self.memory_budget_mb = memory_budget_mb
+        self.spill_dir = spill_dir
+
+    @staticmethod
+    def default_workers() -> int:
+        return os.cpu_count() or 1
\ No newline at end of file
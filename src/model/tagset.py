@@ -0,0 +1,54 @@
+PYMORPHY2_TO_COMMON = {
+    "NOUN": "NOUN",
+    "ADJF": "ADJ",
+    "ADJS": "ADJ",
+    "COMP": "ADJ",
+    "VERB": "VERB",
+    "INFN": "VERB",
+    "PRTF": "VERB",
+    "PRTS": "VERB",
+    "GRND": "VERB",
+    "NUMR": "NUM",
+    "ADVB": "ADV",
+    "PRED": "ADV",
+    "NPRO": "PRON",
+    "PREP": "ADP",
+    "CONJ": "CONJ",
+    "PRCL": "PART",
+    "INTJ": "INTJ",
+    "UNKNOWN": "UNKNOWN",
+}
+
+PYMYSTEM3_TO_COMMON = {
+    "S": "NOUN",
+    "A": "ADJ",
+    "ANUM": "ADJ",
+    "APRO": "ADJ",
+    "V": "VERB",
+    "NUM": "NUM",
+    "ADV": "ADV",
+    "ADVPRO": "ADV",
+    "SPRO": "PRON",
+    "PR": "ADP",
+    "CONJ": "CONJ",
+    "PART": "PART",
+    "INTJ": "INTJ",
+    "UNKNOWN": "UNKNOWN",
+}
+
+TAGSETS = {
+    "pymorphy2": PYMORPHY2_TO_COMMON,
+    "pymystem3": PYMYSTEM3_TO_COMMON,
+}
+
+def to_common_pos(tagset: str, pos: str) -> str:
+    return TAGSETS[tagset].get(pos, "OTHER")
+
+def to_common_grammems(tagset: str, pos_lemma_counts: dict) -> dict:
+    mapping = TAGSETS[tagset]
+    common = {}
+    for pos, lemma_counts in pos_lemma_counts.items():
+        target = common.setdefault(mapping.get(pos, "OTHER"), {})
+        for lemma, count in lemma_counts.items():
+            target[lemma] = target.get(lemma, 0) + count
+    return common
\ No newline at end of file
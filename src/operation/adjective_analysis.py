@@ -2,72 +2,119 @@ from ..interface.text_operation import TextOperation
 from ..util.file_handler import FileHandler
 from ..util.plotter import Plotter
 from ..model.enums import PlotType
-from ..analyzer.pymorphy2_analyzer import Pymorphy2Analyzer
-from ..analyzer.pymystem3_analyzer import Pymystem3Analyzer
+from ..model.settings import RunSettings
+from ..model.file_record import FileRecord
+from ..model.lemma_matrix import LemmaCountMatrix
+from ..util.worker_pool import WorkerPool
+from ..util.instrumentation import instrumentation
+from ..util.analysis_cache import AnalysisCache
 from pathlib import Path
+import numpy as np
 import pandas as pd
 from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor
 from threading import Lock
 from typing import List, Tuple
 
 class AdjectiveAnalysisOperation(TextOperation):
-    def __init__(self, file_handler: FileHandler, plotter: Plotter, adjective_analyzer):
+    name = "adjective_analysis"
+    ADJECTIVES = "ADJ"
+
+    def __init__(self, file_handler: FileHandler, plotter: Plotter, adjective_analyzer, settings: RunSettings = None):
         self.file_handler = file_handler
         self.plotter = plotter
         self.adjective_analyzer = adjective_analyzer
-        self.max_workers = 8
+        self.settings = settings or RunSettings()
+        self.max_workers = self.settings.max_workers
+        self.analysis_cache = AnalysisCache.from_settings(self.settings)
         self.lock = Lock()
 
     def execute(self, periods: List[Tuple[str, str]], folder_path: Path, analyzer, plot_type: PlotType):
-        adjective_types_by_year, all_adjective_types = self.process_files(periods, folder_path, analyzer)
+        adjective_lemmas_by_year = self.aggregate_periods(periods, folder_path, analyzer)
+        self.report(adjective_lemmas_by_year, plot_type)
+        self.discard(adjective_lemmas_by_year)
+
+    def discard(self, adjective_lemmas_by_year: LemmaCountMatrix):
+        adjective_lemmas_by_year.close()
+
+    def new_aggregate(self):
+        return self.new_matrix([])
+
+    def new_matrix(self, periods: List[Tuple[str, str]]) -> LemmaCountMatrix:
+        return LemmaCountMatrix(periods, self.settings.memory_budget_mb, self.settings.spill_dir)
+
+    def add_record(self, adjective_lemmas_by_year: LemmaCountMatrix, period: Tuple[str, str],
+                   local_adjective_lemmas: dict, sign: int = 1):
+        adjective_lemmas_by_year.add_period(period)
+        adjective_lemmas_by_year.add(period, {self.ADJECTIVES: local_adjective_lemmas}, sign)
+
+    def regroup(self, adjective_lemmas_by_year: LemmaCountMatrix, periods: List[Tuple[str, str]]):
+        sorted_periods = sorted(periods, key=lambda x: x[0])
+        return adjective_lemmas_by_year.regroup(
+            sorted_periods,
+            [[(str(year), str(year)) for year in range(int(start), int(end) + 1)] for start, end in sorted_periods]
+        )
+
+    def covered_periods(self, adjective_lemmas_by_year: LemmaCountMatrix) -> List[Tuple[str, str]]:
+        return list(adjective_lemmas_by_year.periods)
+
+    def merge_aggregates(self, left: LemmaCountMatrix, right: LemmaCountMatrix):
+        periods = sorted(set(left.periods) | set(right.periods), key=lambda x: x[0])
+        return self.new_matrix(periods).merge(left).merge(right)
+
+    def report(self, adjective_lemmas_by_year, plot_type: PlotType):
+        adjective_types_by_year, all_adjective_types = self.classify_adjectives(adjective_lemmas_by_year)
         self.save_results(adjective_types_by_year, all_adjective_types, plot_type)
 
-    def process_file(self, file_path: Path, analyzer) -> tuple[dict, set]:
-        text = self.file_handler.read_text_file(file_path)
-        grammems = analyzer.count_grammems_lemmas(text)
-        local_adjective_types = {}
-        local_adjective_lemmas = defaultdict(set)
-        for grammem, lemma_counts in grammems.items():
+    def __getstate__(self):
+        # workers only count lemmas, classification happens once in the main process
+        state = super().__getstate__()
+        state.pop("adjective_analyzer", None)
+        return state
+
+    def process_file(self, file_path: Path, analyzer) -> dict:
+        grammems = self.analyze_file(file_path, analyzer, "count_grammems_lemmas")
+        record = FileRecord.from_grammems_lemmas(grammems)
+        local_adjective_lemmas = {}
+        for grammem, lemma_counts in record.pos_lemma_counts.items():
             if (
-                (isinstance(analyzer, Pymorphy2Analyzer) and grammem in ["ADJF", "ADJS"]) or
-                (isinstance(analyzer, Pymystem3Analyzer) and grammem == "A")
+                (analyzer.name == "pymorphy2" and grammem in ["ADJF", "ADJS"]) or
+                (analyzer.name == "pymystem3" and grammem == "A")
             ):
                 for lemma, count in lemma_counts.items():
-                    adj_type = self.adjective_analyzer.get_qualitative_or_relative(lemma)
-                    local_adjective_types[adj_type] = local_adjective_types.get(adj_type, 0) + count
-                    local_adjective_lemmas[adj_type].add(lemma)
-
-        return local_adjective_types, local_adjective_lemmas
+                    local_adjective_lemmas[lemma] = local_adjective_lemmas.get(lemma, 0) + count
+        return local_adjective_lemmas
 
     def process_files(self, periods: List[Tuple[str, str]], folder_path: Path, analyzer):
+        adjective_lemmas_by_year = self.new_matrix(sorted(periods, key=lambda x: x[0]))
+        with WorkerPool(self.process_file, analyzer, self.settings.execution_mode, self.max_workers) as pool:
+            for period_key, local_adjective_lemmas in self.analyzed_files(pool, periods, folder_path):
+                with self.lock, instrumentation.stage("merge"):
+                    self.add_record(adjective_lemmas_by_year, period_key, local_adjective_lemmas)
+        return adjective_lemmas_by_year
+
+    def classify_adjectives(self, adjective_lemmas_by_year: LemmaCountMatrix):
+        counts = adjective_lemmas_by_year.matrix(self.ADJECTIVES)
+        unique_lemmas = adjective_lemmas_by_year.lemma_names(np.flatnonzero(counts.getnnz(axis=0)))
+        classifications = self.adjective_analyzer.classify_many(sorted(unique_lemmas))
+        lemmas = adjective_lemmas_by_year.lemmas.items
         adjective_types_by_year = {}
         all_adjective_types = defaultdict(set)
-        for start, end in periods:
-            period_key = (start, end)
-            adjective_types_by_year[period_key] = {}
-            files = []
-            for year in range(int(start), int(end) + 1):
-                year_folder = folder_path / str(year)
-                if year_folder.is_dir():
-                    files.extend(list(year_folder.glob("*.txt")) + list(year_folder.glob("*.xml")))
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                futures = [
-                    executor.submit(self.process_file, file_path, analyzer)
-                    for file_path in files
-                ]
-                for future in futures:
-                    local_adjective_types, local_adjective_lemmas = future.result()
-                    with self.lock:
-                        for adj_type, count in local_adjective_types.items():
-                            adjective_types_by_year[period_key][adj_type] = adjective_types_by_year[period_key].get(adj_type, 0) + count
-                        for adj_type, lemmas in local_adjective_lemmas.items():
-                            all_adjective_types[adj_type].update(lemmas)
+        for row, period_key in enumerate(adjective_lemmas_by_year.periods):
+            period_types = adjective_types_by_year[period_key] = {}
+            start, end = counts.indptr[row], counts.indptr[row + 1]
+            for column, count in zip(counts.indices[start:end].tolist(), counts.data[start:end].tolist()):
+                lemma = lemmas[column]
+                adj_type = classifications[lemma]
+                period_types[adj_type] = period_types.get(adj_type, 0) + count
+                all_adjective_types[adj_type].add(lemma)
         return adjective_types_by_year, all_adjective_types
 
     def save_results(self, adjective_types_by_year, all_adjective_types, plot_type: PlotType):
-        data = [{"Лемма": lemma, "Тип": adj_type} for adj_type, lemmas in all_adjective_types.items() for lemma in sorted(lemmas)]
-        self.file_handler.save_to_excel(
+        data = [
+            {"Лемма": lemma, "Тип": adj_type}
+            for adj_type, lemmas in sorted(all_adjective_types.items()) for lemma in sorted(lemmas)
+        ]
+        self.file_handler.save_table(
             pd.DataFrame(data),
             self.file_handler.results_dir / "all_adjectives.xlsx"
         )
@@ -87,7 +134,7 @@ class AdjectiveAnalysisOperation(TextOperation):
             }
             for adj_type in types
         ]
-        self.file_handler.save_to_excel(
+        self.file_handler.save_table(
             pd.DataFrame(data),
             self.file_handler.results_dir / "adjective_type_percentages.xlsx"
         )
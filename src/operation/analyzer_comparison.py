@@ -0,0 +1,182 @@
+from ..interface.text_operation import TextOperation
+from ..util.file_handler import FileHandler
+from ..util.plotter import Plotter
+from ..model.enums import PlotType
+from ..model.settings import RunSettings
+from ..model.file_record import FileRecord
+from ..model.tagset import to_common_grammems
+from ..util.worker_pool import WorkerPool, run_pipeline
+from ..util.instrumentation import instrumentation
+from pathlib import Path
+import pandas as pd
+from contextlib import ExitStack
+from threading import Lock
+from typing import List, Tuple
+
+class AnalyzerComparisonOperation(TextOperation):
+    name = "comparison"
+    requires_analyzer = False
+
+    def __init__(self, file_handler: FileHandler, plotter: Plotter, analyzers: list, settings: RunSettings = None):
+        if len(analyzers) != 2:
+            raise ValueError("Comparison needs exactly two analyzers")
+        self.file_handler = file_handler
+        self.plotter = plotter
+        self.analyzers = list(analyzers)
+        self.settings = settings or RunSettings()
+        self.max_workers = self.settings.max_workers
+        self.analysis_cache = None
+        self.lock = Lock()
+
+    def execute(self, periods: List[Tuple[str, str]], folder_path: Path, analyzer, plot_type: PlotType):
+        records_by_analyzer = self.aggregate_periods(periods, folder_path, analyzer)
+        self.report(records_by_analyzer, plot_type)
+
+    def merge_aggregates(self, left, right):
+        merged = {
+            name: {period: FileRecord().merge(record) for period, record in records_by_year.items()}
+            for name, records_by_year in left.items()
+        }
+        for name, records_by_year in right.items():
+            for period, record in records_by_year.items():
+                merged.setdefault(name, {}).setdefault(period, FileRecord()).merge(record)
+        return merged
+
+    def report(self, records_by_analyzer, plot_type: PlotType):
+        self.save_results(records_by_analyzer, plot_type)
+
+    def new_aggregate(self):
+        return {analyzer.name: {} for analyzer in self.analyzers}
+
+    def add_record(self, records_by_analyzer, period: Tuple[str, str], named_record, sign: int = 1):
+        name, record = named_record
+        target = records_by_analyzer.setdefault(name, {}).setdefault(period, FileRecord())
+        if sign > 0:
+            target.merge(record)
+        else:
+            target.subtract(record)
+
+    def regroup(self, records_by_analyzer, periods: List[Tuple[str, str]]):
+        regrouped = {}
+        for name, records_by_year in records_by_analyzer.items():
+            for start, end in periods:
+                self.add_record(regrouped, (start, end), (name, FileRecord()))
+                for year in range(int(start), int(end) + 1):
+                    record = records_by_year.get((str(year), str(year)))
+                    if record is not None:
+                        self.add_record(regrouped, (start, end), (name, record))
+        return regrouped
+
+    def covered_periods(self, records_by_analyzer) -> List[Tuple[str, str]]:
+        return sorted({period for records_by_year in records_by_analyzer.values() for period in records_by_year})
+
+    def analyzer_key(self, analyzer) -> str:
+        return "+".join(analyzer.cache_key() for analyzer in self.analyzers)
+
+    def update_incremental(self, folder_path: Path, analyzer):
+        # files are read once here and handed to both analyzers as text, there is no per-file analyzer to track
+        raise ValueError("Incremental updates are not supported for the analyzer comparison")
+
+    def __getstate__(self):
+        # each pool ships its own analyzer to its workers
+        state = super().__getstate__()
+        state.pop("analyzers", None)
+        return state
+
+    def process_file(self, text: str, analyzer) -> FileRecord:
+        return FileRecord.from_grammems_lemmas(analyzer.count_grammems_lemmas(text))
+
+    def process_files(self, periods: List[Tuple[str, str]], folder_path: Path, analyzer=None):
+        records_by_analyzer = {analyzer.name: {} for analyzer in self.analyzers}
+        with ExitStack() as stack:
+            pools = [
+                (analyzer.name, stack.enter_context(
+                    WorkerPool(self.process_file, analyzer, self.settings.execution_mode, self.max_workers)
+                ))
+                for analyzer in self.analyzers
+            ]
+            for period_key in periods:
+                for records_by_year in records_by_analyzer.values():
+                    records_by_year[period_key] = FileRecord()
+            files = self.schedule(periods, folder_path)
+            # reader threads load each text once, both analyzers get it as soon as it is read
+            pipeline = run_pipeline(files, [pool for _, pool in pools], read=self.file_handler.read_text_or_empty)
+            for file_path, index, record in pipeline:
+                with self.lock, instrumentation.stage("merge"):
+                    self.add_record(records_by_analyzer, files[file_path], (pools[index][0], record))
+        return records_by_analyzer
+
+    def save_results(self, records_by_analyzer, plot_type: PlotType):
+        output_dir = self.file_handler.results_dir / "comparison"
+        first, second = records_by_analyzer.keys()
+        periods = sorted(records_by_analyzer[first].keys(), key=lambda x: x[0])
+        period_labels = [f"{start}-{end}" if start != end else start for start, end in periods]
+
+        for name, records_by_year in records_by_analyzer.items():
+            data = [
+                {
+                    "Период": label,
+                    "Часть речи": grammem,
+                    "Количество": count,
+                    "Процент": round(count / records_by_year[period].token_count * 100, 5)
+                    if records_by_year[period].token_count > 0 else 0.0
+                }
+                for period, label in zip(periods, period_labels)
+                for grammem, count in sorted(records_by_year[period].pos_counts.items())
+            ]
+            self.file_handler.save_table(pd.DataFrame(data), output_dir / f"{name}_pos_counts.xlsx")
+
+        common = {
+            name: {period: to_common_grammems(name, record.pos_lemma_counts) for period, record in records_by_year.items()}
+            for name, records_by_year in records_by_analyzer.items()
+        }
+
+        pos_rows = []
+        overall_agreement = []
+        for period, label in zip(periods, period_labels):
+            shares = {}
+            for name in (first, second):
+                pos_counts = {grammem: sum(lemmas.values()) for grammem, lemmas in common[name][period].items()}
+                total = sum(pos_counts.values())
+                shares[name] = {grammem: count / total * 100 if total else 0.0 for grammem, count in pos_counts.items()}
+            grammems = sorted(set(shares[first]) | set(shares[second]))
+            for grammem in grammems:
+                first_share = shares[first].get(grammem, 0.0)
+                second_share = shares[second].get(grammem, 0.0)
+                pos_rows.append({
+                    "Период": label,
+                    "Часть речи": grammem,
+                    f"Процент {first}": round(first_share, 5),
+                    f"Процент {second}": round(second_share, 5),
+                    "Согласие (%)": round(min(first_share, second_share) / max(first_share, second_share) * 100, 2)
+                    if max(first_share, second_share) > 0 else 100.0
+                })
+            overall_agreement.append(round(sum(
+                min(shares[first].get(grammem, 0.0), shares[second].get(grammem, 0.0)) for grammem in grammems
+            ), 2))
+        self.file_handler.save_table(pd.DataFrame(pos_rows), output_dir / "pos_agreement.xlsx")
+
+        lemma_totals = {}
+        for index, name in enumerate((first, second)):
+            for period in periods:
+                for grammem, lemma_counts in common[name][period].items():
+                    for lemma, count in lemma_counts.items():
+                        totals = lemma_totals.setdefault((grammem, lemma), [0, 0])
+                        totals[index] += count
+        lemma_rows = [
+            {
+                "Часть речи": grammem,
+                "Лемма": lemma,
+                f"Количество {first}": first_count,
+                f"Количество {second}": second_count,
+                "Согласие (%)": round(min(first_count, second_count) / max(first_count, second_count) * 100, 2)
+            }
+            for (grammem, lemma), (first_count, second_count) in sorted(lemma_totals.items())
+        ]
+        self.file_handler.save_table(pd.DataFrame(lemma_rows), output_dir / "lemma_agreement.xlsx")
+
+        self.plotter.create_plot(
+            period_labels, overall_agreement, plot_type,
+            f"Согласие {first} и {second} по частям речи", "Период", "Согласие (%)",
+            output_dir / "pos_agreement_plot.png"
+        )
\ No newline at end of file
@@ -1,53 +1,98 @@
 from ..interface.text_operation import TextOperation
-from ..util.file_handler import FileHandler
+from ..util.file_handler import FileHandler, FileReadError
 from ..util.plotter import Plotter
-from ..model.enums import PlotType
+from ..model.enums import PlotType, OutputFormat
+from ..model.settings import RunSettings
+from ..util.worker_pool import WorkerPool
+from ..util.instrumentation import instrumentation
+from ..util.analysis_cache import AnalysisCache
 from pathlib import Path
 import pandas as pd
-from concurrent.futures import ThreadPoolExecutor
 from threading import Lock
+import time
 from typing import List, Tuple
 
 class LemmatizationOperation(TextOperation):
-    def __init__(self, file_handler: FileHandler, plotter: Plotter):
+    name = "lemmatization"
+    COLUMNS = ["Токен", "Лемма"]
+
+    def __init__(self, file_handler: FileHandler, plotter: Plotter, settings: RunSettings = None):
         self.file_handler = file_handler
         self.plotter = plotter
-        self.max_workers = 8
+        self.settings = settings or RunSettings()
+        self.max_workers = self.settings.max_workers
+        self.analysis_cache = AnalysisCache.from_settings(self.settings)
         self.lock = Lock()
 
     def execute(self, periods: List[Tuple[str, str]], folder_path: Path, analyzer, plot_type: PlotType):
-        word_counts = self.process_files(periods, folder_path, analyzer)
-        self.save_results(periods, word_counts, plot_type)
+        word_counts = self.aggregate_periods(periods, folder_path, analyzer)
+        self.report(word_counts, plot_type)
 
-    def process_file(self, file_path: Path, analyzer, year_dir: Path) -> int:
-        text = self.file_handler.read_text_file(file_path)
-        lemmas = analyzer.lemmatize(text)
-        self.file_handler.save_to_excel(
-            pd.DataFrame(lemmas, columns=["Токен", "Лемма"]),
-            year_dir / f"{file_path.stem}_lemmatization_results.xlsx"
-        )
+    def new_aggregate(self):
+        return {}
+
+    def add_record(self, word_counts, period: Tuple[str, str], word_count: int, sign: int = 1):
+        word_counts[period] = word_counts.get(period, 0) + sign * word_count
+
+    def regroup(self, word_counts, periods: List[Tuple[str, str]]):
+        return {
+            (start, end): sum(word_counts.get((str(year), str(year)), 0) for year in range(int(start), int(end) + 1))
+            for start, end in periods
+        }
+
+    def covered_periods(self, word_counts) -> List[Tuple[str, str]]:
+        return list(word_counts)
+
+    def forget_file(self, file_path: Path):
+        # tables are named by stem, a remaining a.xml still owns the table of a removed a.txt
+        siblings = self.year_files(file_path.parent.parent, file_path.parent.name)
+        if any(sibling.stem == file_path.stem for sibling in siblings):
+            return
+        year_dir = self.file_handler.results_dir / file_path.parent.name
+        for output_format in OutputFormat:
+            (year_dir / f"{file_path.stem}_lemmatization_results{output_format.value}").unlink(missing_ok=True)
+
+    def merge_aggregates(self, left, right):
+        merged = dict(left)
+        for period, count in right.items():
+            merged[period] = merged.get(period, 0) + count
+        return merged
+
+    def report(self, word_counts, plot_type: PlotType):
+        self.save_results(list(word_counts), word_counts, plot_type)
+
+    def process_file(self, file_path: Path, analyzer) -> int:
+        year_dir = self.file_handler.results_dir / file_path.parent.name
+        year_dir.mkdir(exist_ok=True)
+        output_path = year_dir / f"{file_path.stem}_lemmatization_results.xlsx"
+        try:
+            if self.is_streamed(file_path):
+                return self.stream_lemmas(file_path, analyzer, output_path)
+        except FileReadError as e:
+            print(e)
+            lemmas = []
+        else:
+            lemmas = self.analyze_file(file_path, analyzer, "lemmatize")
+        self.file_handler.save_table(pd.DataFrame(lemmas, columns=self.COLUMNS), output_path)
         return len(lemmas)
 
+    def stream_lemmas(self, file_path: Path, analyzer, output_path: Path) -> int:
+        # large files go to CSV as they are lemmatized, the token list is never held and not cached
+        started = time.perf_counter()
+        with instrumentation.stage("analyze"):
+            chunks = self.file_handler.iter_text_chunks(file_path, self.settings.chunk_chars)
+            word_count = self.file_handler.stream_table(analyzer.lemmatize_stream(chunks), self.COLUMNS, output_path)
+        instrumentation.record_file(file_path, time.perf_counter() - started, word_count)
+        return word_count
+
     def process_files(self, periods: List[Tuple[str, str]], folder_path: Path, analyzer):
         word_counts_by_year = {}
-        for start, end in periods:
-            period_key = (start, end)
-            word_counts_by_year[period_key] = 0
-            for year in range(int(start), int(end) + 1):
-                year_folder = folder_path / str(year)
-                if year_folder.is_dir():
-                    year_dir = self.file_handler.results_dir / str(year)
-                    year_dir.mkdir(exist_ok=True)
-                    files = list(year_folder.glob("*.txt")) + list(year_folder.glob("*.xml"))
-                    with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                        futures = [
-                            executor.submit(self.process_file, file_path, analyzer, year_dir)
-                            for file_path in files
-                        ]
-                        for future in futures:
-                            word_count = future.result()
-                            with self.lock:
-                                word_counts_by_year[period_key] += word_count
+        with WorkerPool(self.process_file, analyzer, self.settings.execution_mode, self.max_workers) as pool:
+            for period_key in periods:
+                word_counts_by_year[period_key] = 0
+            for period_key, word_count in self.analyzed_files(pool, periods, folder_path):
+                with self.lock, instrumentation.stage("merge"):
+                    self.add_record(word_counts_by_year, period_key, word_count)
         return word_counts_by_year
     
     def save_results(self, periods: List[Tuple[str, str]], word_counts, plot_type: PlotType):
@@ -61,7 +106,7 @@ class LemmatizationOperation(TextOperation):
             "Количество слов",
             self.file_handler.results_dir / "word_count_plot.png"
         )
-        self.file_handler.save_to_excel(
+        self.file_handler.save_table(
             pd.DataFrame(
                 [{"Период": f"{start}-{end}" if start != end else start, "Количество слов": count} for (start, end), count in word_counts.items()]
             ),
@@ -2,54 +2,80 @@ from ..interface.text_operation import TextOperation
 from ..util.file_handler import FileHandler
 from ..util.plotter import Plotter
 from ..model.enums import PlotType
-from .lemmatization import LemmatizationOperation
+from ..model.settings import RunSettings
+from ..model.file_record import FileRecord
+from ..util.worker_pool import WorkerPool
+from ..util.instrumentation import instrumentation
+from ..util.analysis_cache import AnalysisCache
 from pathlib import Path
 import pandas as pd
-from concurrent.futures import ThreadPoolExecutor
 from threading import Lock
 from typing import List, Tuple
 
 class POSCountOperation(TextOperation):
-    def __init__(self, file_handler: FileHandler, plotter: Plotter):
+    name = "pos_count"
+
+    def __init__(self, file_handler: FileHandler, plotter: Plotter, settings: RunSettings = None):
         self.file_handler = file_handler
         self.plotter = plotter
-        self.max_workers = 8
+        self.settings = settings or RunSettings()
+        self.max_workers = self.settings.max_workers
+        self.analysis_cache = AnalysisCache.from_settings(self.settings)
         self.lock = Lock()
 
     def execute(self, periods: List[Tuple[str, str]], folder_path: Path, analyzer, plot_type: PlotType):
-        pos_counts_by_year = self.process_files(periods, folder_path, analyzer)
-        word_counts = LemmatizationOperation(self.file_handler, self.plotter).process_files(periods, folder_path, analyzer)
-        self.save_results(pos_counts_by_year, word_counts, plot_type)
+        records_by_year = self.aggregate_periods(periods, folder_path, analyzer)
+        self.report(records_by_year, plot_type)
 
-    def process_file(self, file_path: Path, analyzer) -> dict:
-        text = self.file_handler.read_text_file(file_path)
-        grammems = analyzer.count_grammems(text)
-        return grammems
+    def new_aggregate(self):
+        return {}
 
-    def process_files(self, periods: List[Tuple[str, str]], folder_path: Path, analyzer):
-        pos_counts_by_year = {}
+    def add_record(self, records_by_year, period: Tuple[str, str], record: FileRecord, sign: int = 1):
+        target = records_by_year.setdefault(period, FileRecord())
+        if sign > 0:
+            target.merge(record)
+        else:
+            target.subtract(record)
+
+    def regroup(self, records_by_year, periods: List[Tuple[str, str]]):
+        regrouped = {}
         for start, end in periods:
-            period_key = (start, end)
-            pos_counts_by_year[period_key] = {}
-            files = []
+            target = regrouped[(start, end)] = FileRecord()
             for year in range(int(start), int(end) + 1):
-                year_folder = folder_path / str(year)
-                if year_folder.is_dir():
-                    files.extend(list(year_folder.glob("*.txt")) + list(year_folder.glob("*.xml")))
+                record = records_by_year.get((str(year), str(year)))
+                if record is not None:
+                    target.merge(record)
+        return regrouped
+
+    def covered_periods(self, records_by_year) -> List[Tuple[str, str]]:
+        return list(records_by_year)
 
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                futures = [
-                    executor.submit(self.process_file, file_path, analyzer)
-                    for file_path in files
-                ]
-                for future in futures:
-                    grammems = future.result()
-                    with self.lock:
-                        for grammem, count in grammems.items():
-                            pos_counts_by_year[period_key][grammem] = pos_counts_by_year[period_key].get(grammem, 0) + count
-        return pos_counts_by_year
+    def merge_aggregates(self, left, right):
+        merged = {period: FileRecord().merge(record) for period, record in left.items()}
+        for period, record in right.items():
+            merged.setdefault(period, FileRecord()).merge(record)
+        return merged
+
+    def report(self, records_by_year, plot_type: PlotType):
+        self.save_results(records_by_year, plot_type)
+
+    def process_file(self, file_path: Path, analyzer) -> FileRecord:
+        grammems = self.analyze_file(file_path, analyzer, "count_grammems_lemmas")
+        return FileRecord.from_grammems_lemmas(grammems, keep_lemmas=False)
+
+    def process_files(self, periods: List[Tuple[str, str]], folder_path: Path, analyzer):
+        records_by_year = {}
+        with WorkerPool(self.process_file, analyzer, self.settings.execution_mode, self.max_workers) as pool:
+            for period_key in periods:
+                records_by_year[period_key] = FileRecord()
+            for period_key, record in self.analyzed_files(pool, periods, folder_path):
+                with self.lock, instrumentation.stage("merge"):
+                    self.add_record(records_by_year, period_key, record)
+        return records_by_year
 
-    def save_results(self, pos_counts_by_year, word_counts, plot_type: PlotType):
+    def save_results(self, records_by_year, plot_type: PlotType):
+        pos_counts_by_year = {period: record.pos_counts for period, record in records_by_year.items()}
+        word_counts = {period: record.token_count for period, record in records_by_year.items()}
         all_grammems = set()
         for period in pos_counts_by_year:
             all_grammems.update(pos_counts_by_year[period].keys())
@@ -66,7 +92,7 @@ class POSCountOperation(TextOperation):
                 f"Количество {grammem}": counts,
                 f"Процент {grammem}": frequencies
             })
-            self.file_handler.save_to_excel(df, self.file_handler.results_dir / f"{grammem}_counts.xlsx")
+            self.file_handler.save_table(df, self.file_handler.results_dir / f"{grammem}_counts.xlsx")
             self.plotter.create_plot(
                 period_labels, frequencies, plot_type,
                 f"Процент слов для {grammem}", "Период", "Процент",
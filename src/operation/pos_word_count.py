@@ -1,117 +1,157 @@
 from ..interface.text_operation import TextOperation
 from ..util.file_handler import FileHandler
-from ..util.plotter import Plotter
-from ..model.enums import PlotType
-from .lemmatization import LemmatizationOperation
+from ..util.plotter import Plotter, SPEC_SUFFIX
+from ..model.enums import PlotType, PlotMode
+from ..model.settings import RunSettings
+from ..model.file_record import FileRecord
+from ..model.lemma_matrix import LemmaCountMatrix
+from ..model.lemma_index import LemmaIndex
+from ..util.worker_pool import WorkerPool
+from ..util.instrumentation import instrumentation
+from ..util.analysis_cache import AnalysisCache
 from pathlib import Path
+import numpy as np
 import pandas as pd
-from concurrent.futures import ThreadPoolExecutor
 from threading import Lock
 from typing import List, Tuple
 
 class POSWordCountOperation(TextOperation):
-    def __init__(self, file_handler: FileHandler, plotter: Plotter):
+    name = "pos_word_count"
+
+    def __init__(self, file_handler: FileHandler, plotter: Plotter, settings: RunSettings = None):
         self.file_handler = file_handler
         self.plotter = plotter
-        self.max_workers = 8
+        self.settings = settings or RunSettings()
+        self.max_workers = self.settings.max_workers
+        self.analysis_cache = AnalysisCache.from_settings(self.settings)
         self.lock = Lock()
 
     def execute(self,periods: List[Tuple[str, str]], folder_path: Path, analyzer, plot_type: PlotType):
-        word_counts_by_year = self.process_files(periods, folder_path, analyzer)
-        word_counts = LemmatizationOperation(self.file_handler, self.plotter).process_files(periods, folder_path, analyzer)
-        self.save_results(word_counts_by_year, word_counts)
-        self.interactive_for_words(word_counts_by_year, word_counts, plot_type)
+        aggregate = self.aggregate_periods(periods, folder_path, analyzer)
+        self.report(aggregate, plot_type)
+        self.explore(aggregate, plot_type)
+        self.discard(aggregate)
+
+    def discard(self, aggregate):
+        lemma_counts, _ = aggregate
+        lemma_counts.close()
+
+    def explore(self, aggregate, plot_type: PlotType):
+        lemma_counts, word_counts = aggregate
+        self.interactive_for_words(lemma_counts, word_counts, plot_type)
+
+    def new_aggregate(self):
+        return self.new_matrix([]), {}
+
+    def new_matrix(self, periods: List[Tuple[str, str]]) -> LemmaCountMatrix:
+        return LemmaCountMatrix(periods, self.settings.memory_budget_mb, self.settings.spill_dir)
+
+    def add_record(self, aggregate, period: Tuple[str, str], record: FileRecord, sign: int = 1):
+        lemma_counts, word_counts = aggregate
+        lemma_counts.add_period(period)
+        lemma_counts.add(period, record.pos_lemma_counts, sign)
+        word_counts[period] = word_counts.get(period, 0) + sign * record.token_count
+
+    def regroup(self, aggregate, periods: List[Tuple[str, str]]):
+        lemma_counts, word_counts = aggregate
+        members = {
+            (start, end): [(str(year), str(year)) for year in range(int(start), int(end) + 1)]
+            for start, end in periods
+        }
+        sorted_periods = sorted(periods, key=lambda x: x[0])
+        return (
+            lemma_counts.regroup(sorted_periods, [members[period] for period in sorted_periods]),
+            {period: sum(word_counts.get(year, 0) for year in members[period]) for period in periods}
+        )
 
-    def process_file(self, file_path: Path, analyzer) -> dict:
-        text = self.file_handler.read_text_file(file_path)
-        grammems = analyzer.count_grammems_lemmas(text)
-        return grammems
+    def covered_periods(self, aggregate) -> List[Tuple[str, str]]:
+        _, word_counts = aggregate
+        return list(word_counts)
+
+    def merge_aggregates(self, left, right):
+        (left_counts, left_words), (right_counts, right_words) = left, right
+        periods = sorted(set(left_counts.periods) | set(right_counts.periods), key=lambda x: x[0])
+        lemma_counts = self.new_matrix(periods).merge(left_counts).merge(right_counts)
+        word_counts = dict(left_words)
+        for period, count in right_words.items():
+            word_counts[period] = word_counts.get(period, 0) + count
+        return lemma_counts, word_counts
+
+    def report(self, aggregate, plot_type: PlotType):
+        lemma_counts, word_counts = aggregate
+        self.save_results(lemma_counts, word_counts)
+
+    def process_file(self, file_path: Path, analyzer) -> FileRecord:
+        grammems = self.analyze_file(file_path, analyzer, "count_grammems_lemmas")
+        return FileRecord.from_grammems_lemmas(grammems)
 
     def process_files(self, periods: List[Tuple[str, str]],  folder_path: Path, analyzer):
-        word_counts_by_year = {}
-        for start, end in periods:
-            period_key = (start, end)
-            word_counts_by_year[period_key] = {}
-            files = []
-            for year in range(int(start), int(end) + 1):
-                year_folder = folder_path / str(year)
-                if year_folder.is_dir():
-                    files.extend(list(year_folder.glob("*.txt")) + list(year_folder.glob("*.xml")))
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                futures = [
-                    executor.submit(self.process_file, file_path, analyzer)
-                    for file_path in files
-                ]
-                for future in futures:
-                    grammems = future.result()
-                    with self.lock:
-                        for grammem, lemma_counts in grammems.items():
-                            if grammem not in word_counts_by_year[period_key]:
-                                word_counts_by_year[period_key][grammem] = {}
-                            for lemma, count in lemma_counts.items():
-                                word_counts_by_year[period_key][grammem][lemma] = word_counts_by_year[period_key][grammem].get(lemma, 0) + count
-        return word_counts_by_year
-
-
-    def save_results(self, word_counts_by_year, word_counts):
-        all_grammems = set()
-        for year in word_counts_by_year:
-            all_grammems.update(word_counts_by_year[year].keys())
-        for grammem in all_grammems:
+        lemma_counts = self.new_matrix(sorted(periods, key=lambda x: x[0]))
+        word_counts = {}
+        with WorkerPool(self.process_file, analyzer, self.settings.execution_mode, self.max_workers) as pool:
+            for period_key in periods:
+                word_counts[period_key] = 0
+            for period_key, record in self.analyzed_files(pool, periods, folder_path):
+                with self.lock, instrumentation.stage("merge"):
+                    self.add_record((lemma_counts, word_counts), period_key, record)
+        return lemma_counts, word_counts
+
+    def ipm(self, counts: np.ndarray, periods: List[Tuple[str, str]], word_counts) -> np.ndarray:
+        totals = np.array([word_counts.get(period, 1) for period in periods], dtype=np.float64)
+        safe_totals = np.where(totals > 0, totals, 1.0)
+        return np.round(np.where(totals > 0, counts / safe_totals * 1_000_000, 0.0), 5)
+
+    def save_results(self, lemma_counts: LemmaCountMatrix, word_counts):
+        periods = lemma_counts.periods
+        period_labels = [f"{start}-{end}" if start != end else start for start, end in periods]
+        for grammem in lemma_counts.grammems():
             grammem_dir = self.file_handler.results_dir / grammem
             grammem_dir.mkdir(exist_ok=True)
-            periods = sorted(word_counts_by_year.keys(), key=lambda x: x[0])
-            period_labels = [f"{start}-{end}" if start != end else start for start, end in periods]
-            all_lemmas = set()
-            for period in periods:
-                all_lemmas.update(word_counts_by_year[period].get(grammem, {}).keys())
-            data = [
-                {
-                    "Лемма": lemma,
-                    **{
-                        period_labels[i]: round(
-                            word_counts_by_year[period].get(grammem, {}).get(lemma, 0) / word_counts.get(period, 1) * 1_000_000, 5
-                        ) if word_counts.get(period, 1) > 0 else 0.0
-                        for i, period in enumerate(periods)
-                    }
-                }
-                for lemma in all_lemmas
-            ]
-            self.file_handler.save_to_excel(
-                pd.DataFrame(data),
+            columns, counts = lemma_counts.lemma_columns(grammem)
+            # lemma ids follow the order in which results arrived, names give every run the same row order
+            names = lemma_counts.lemma_names(columns)
+            order = sorted(range(len(names)), key=names.__getitem__)
+            frequencies = self.ipm(counts.T[order], periods, word_counts)
+            df = pd.DataFrame(frequencies, columns=period_labels)
+            df.insert(0, "Лемма", [names[i] for i in order])
+            self.file_handler.save_table(
+                df,
                 grammem_dir / f"{grammem}_frequencies.xlsx"
             )
-            
-    def interactive_for_words(self, word_counts_by_year, word_counts, plot_type: PlotType):
+
+    def interactive_for_words(self, lemma_counts: LemmaCountMatrix, word_counts, plot_type: PlotType):
         print("Результаты сохранены. Доступен разбор для каждого слова:")
-        all_grammems = set()
-        for year in word_counts_by_year:
-            all_grammems.update(word_counts_by_year[year].keys())
+        index = LemmaIndex(lemma_counts)
+        periods = index.periods
+        period_labels = [f"{start}-{end}" if start != end else start for start, end in periods]
         while True:
-            print("\nДоступные части речи:", ", ".join(sorted(all_grammems)))
+            print("\nДоступные части речи:", ", ".join(index.grammems()))
             grammem = input("Введите часть речи (или 'q' для выхода): ").strip()
             if grammem.lower() == 'q':
                 break
-            if grammem not in all_grammems:
+            if grammem not in index:
                 print("Ошибка: указанная часть речи не найдена.")
                 continue
 
-            available_lemmas = set()
-            for period in word_counts_by_year:
-                available_lemmas.update(word_counts_by_year[period].get(grammem, {}).keys())
-            print(f"Доступные леммы для {grammem} (первые 10):", ", ".join(sorted(available_lemmas)[:10]), "...")
-            lemma = input("Введите слово (лемму): ").strip().lower()
-            if lemma not in available_lemmas:
+            print(f"Самые частые леммы для {grammem}:", ", ".join(index.top(grammem)), "...")
+            lemma = input("Введите слово (лемму) или начало слова со звёздочкой, например 'дом*': ").strip().lower()
+            if lemma.endswith("*"):
+                prefix = lemma.rstrip("*")
+                matches = index.top(grammem, prefix=prefix)
+                if not matches:
+                    print("Ошибка: нет лемм с таким началом.")
+                    continue
+                print(f"Леммы на '{prefix}' ({index.count_prefix(grammem, prefix)}):", ", ".join(matches))
+                lemma = input("Введите слово (лемму): ").strip().lower()
+            counts = index.vector(grammem, lemma)
+            if counts is None:
+                suggestions = index.suggest(grammem, lemma)
                 print("Ошибка: указанная лемма не найдена для данной части речи.")
+                if suggestions:
+                    print("Похожие леммы:", ", ".join(suggestions))
                 continue
 
-            periods = sorted(word_counts_by_year.keys(), key=lambda x: x[0])
-            period_labels = [f"{start}-{end}" if start != end else start for start, end in periods]
-            frequencies = [
-                round(word_counts_by_year[period].get(grammem, {}).get(lemma, 0) / word_counts.get(period, 1) * 1_000_000, 5)
-                if word_counts.get(period, 1) > 0 else 0.0
-                for period in periods
-            ]
+            frequencies = self.ipm(counts, periods, word_counts).tolist()
 
             output_path = self.file_handler.results_dir / f"{grammem}_{lemma}_frequency_plot.png"
             self.plotter.create_plot(
@@ -120,4 +160,8 @@ class POSWordCountOperation(TextOperation):
                 "Период", "Частота (IPM)",
                 output_path
             )
-            print(f"График сохранён: {output_path}")
\ No newline at end of file
+            self.plotter.flush()
+            if self.plotter.mode == PlotMode.DEFERRED:
+                print(f"Описание графика сохранено: {output_path.with_suffix(SPEC_SUFFIX)}")
+            elif self.plotter.mode != PlotMode.SKIP:
+                print(f"График сохранён: {output_path}")
\ No newline at end of file
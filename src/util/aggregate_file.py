@@ -0,0 +1,45 @@
+from typing import BinaryIO
+import gzip
+import pickle
+
+# objects with write_sections/read_sections (lemma matrices) are kept out of the pickle and streamed after it,
+# so a spilled aggregate is written and read one part at a time instead of being built in memory first
+
+class _Pickler(pickle.Pickler):
+    def __init__(self, file, streamed: list):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.streamed = streamed
+
+    def persistent_id(self, obj):
+        if hasattr(type(obj), "write_sections"):
+            self.streamed.append(obj)
+            return len(self.streamed) - 1, type(obj)
+        return None
+
+class _Unpickler(pickle.Unpickler):
+    def __init__(self, file, streamed: list):
+        super().__init__(file)
+        self.streamed = streamed
+
+    def persistent_load(self, pid):
+        # filled in place once the pickle itself has been read
+        _, cls = pid
+        obj = cls.__new__(cls)
+        self.streamed.append(obj)
+        return obj
+
+def dump(obj, f: BinaryIO):
+    with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=1, mtime=0) as stream:
+        streamed = []
+        _Pickler(stream, streamed).dump(obj)
+        for part in streamed:
+            part.write_sections(stream)
+
+def load(f: BinaryIO, settings=None):
+    # settings are the loading run's RunSettings, handed to every streamed part
+    with gzip.GzipFile(fileobj=f, mode="rb") as stream:
+        streamed = []
+        obj = _Unpickler(stream, streamed).load()
+        for part in streamed:
+            part.read_sections(stream, settings)
+        return obj
\ No newline at end of file
@@ -0,0 +1,104 @@
+from .instrumentation import instrumentation
+from pathlib import Path
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+import zlib
+
+class AnalysisCache:
+    FORMAT_VERSION = 1
+
+    def __init__(self, cache_dir: str = "cache", max_size_mb: int = 2048, max_age_days: float = None):
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.max_age_seconds = max_age_days * 86400 if max_age_days is not None else None
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_settings(cls, settings):
+        if not settings.cache_dir:
+            return None
+        return cls(settings.cache_dir, settings.cache_max_size_mb, settings.cache_max_age_days)
+
+    @staticmethod
+    def file_digest(file_path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            while True:
+                block = f.read(1 << 20)
+                if not block:
+                    break
+                digest.update(block)
+        return digest.hexdigest()
+
+    def make_key(self, digest: str, analyzer, method: str) -> str:
+        raw = f"{self.FORMAT_VERSION}\0{analyzer.cache_key()}\0{method}\0{digest}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.bin"
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.loads(zlib.decompress(f.read()))
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key: str, value):
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        data = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get_or_compute(self, file_path: Path, analyzer, method: str, compute):
+        try:
+            digest = self.file_digest(file_path)
+        except OSError:
+            # an unreadable file is left to compute(), which reports it the same way as without a cache
+            instrumentation.count("analysis_cache_misses")
+            return compute()
+        key = self.make_key(digest, analyzer, method)
+        value = self.get(key)
+        if value is None:
+            instrumentation.count("analysis_cache_misses")
+            value = compute()
+            self.put(key, value)
+        else:
+            instrumentation.count("analysis_cache_hits")
+        return value
+
+    def prune(self):
+        entries = []
+        now = time.time()
+        for path in self.cache_dir.glob("*/*.bin"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if self.max_age_seconds is not None and now - stat.st_mtime > self.max_age_seconds:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_size_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
\ No newline at end of file
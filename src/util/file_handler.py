@@ -1,26 +1,184 @@
+from ..model.enums import OutputFormat
+from .result_writer import ResultWriter
+from .instrumentation import instrumentation
+from contextlib import contextmanager
 from pathlib import Path
-import pandas as pd
 import xml.etree.ElementTree as ET
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional
+import csv
+import os
+import re
+import tempfile
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+_WHITESPACE = re.compile(r'\s')
+
+class FileReadError(Exception):
+    pass
+
+class _TextCollector:
+    def __init__(self):
+        self.parts = []
+
+    def data(self, data: str):
+        self.parts.append(data)
+
+    def close(self):
+        pass
 
 class FileHandler:
-    def __init__(self, results_dir: str = "results"):
+    BOUNDARY_CHARS = ".!?\n"
+    READ_BLOCK_BYTES = 1 << 20
+
+    def __init__(self, results_dir: str = "results", output_format: OutputFormat = OutputFormat.XLSX):
         self.results_dir = Path(results_dir)
         self.results_dir.mkdir(exist_ok=True)
+        self.output_format = output_format
+        self.writer = None
+
+    def __getstate__(self):
+        # worker processes write synchronously, the writer thread lives in the main process
+        state = self.__dict__.copy()
+        state["writer"] = None
+        return state
 
     def read_text_file(self, file_path: Path) -> str:
+        with instrumentation.stage("read"):
+            try:
+                if file_path.suffix.lower() == ".txt":
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        return f.read()
+                elif file_path.suffix.lower() == ".xml":
+                    tree = ET.parse(file_path)
+                    return ET.tostring(tree.getroot(), encoding='unicode', method='text')
+            except Exception as e:
+                raise FileReadError(f"Error reading {file_path}: {e}") from e
+            raise FileReadError(f"Unsupported file format: {file_path}")
+
+    def read_text_or_empty(self, file_path: Path) -> str:
+        try:
+            return self.read_text_file(file_path)
+        except FileReadError as e:
+            print(e)
+            return ""
+
+    def iter_text_chunks(self, file_path: Path, chunk_chars: int = 1_000_000) -> Iterator[str]:
+        # raised mid-stream as well, after some chunks have already been analyzed
         try:
             if file_path.suffix.lower() == ".txt":
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return f.read()
+                yield from self._rechunk(self._iter_txt(file_path, chunk_chars), chunk_chars)
             elif file_path.suffix.lower() == ".xml":
-                tree = ET.parse(file_path)
-                return ET.tostring(tree.getroot(), encoding='unicode', method='text')
-            print(f"Unsupported file format: {file_path}")
-            return ""
+                yield from self._rechunk(self._iter_xml(file_path), chunk_chars)
+            else:
+                raise FileReadError(f"Unsupported file format: {file_path}")
+        except FileReadError:
+            raise
         except Exception as e:
-            print(f"Error reading {file_path}: {e}")
-            return ""
+            raise FileReadError(f"Error reading {file_path}: {e}") from e
+
+    def _iter_txt(self, file_path: Path, chunk_chars: int) -> Iterator[str]:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            while True:
+                block = f.read(chunk_chars)
+                if not block:
+                    return
+                yield block
+
+    def _iter_xml(self, file_path: Path) -> Iterator[str]:
+        collector = _TextCollector()
+        parser = ET.XMLParser(target=collector)
+        with open(file_path, 'rb') as f:
+            while True:
+                block = f.read(self.READ_BLOCK_BYTES)
+                if not block:
+                    break
+                parser.feed(block)
+                if collector.parts:
+                    yield "".join(collector.parts)
+                    collector.parts.clear()
+        parser.close()
+        if collector.parts:
+            yield "".join(collector.parts)
+
+    def _rechunk(self, pieces: Iterable[str], chunk_chars: int) -> Iterator[str]:
+        buffer = ""
+        for piece in pieces:
+            buffer += piece
+            while len(buffer) >= chunk_chars:
+                cut = self._find_boundary(buffer, chunk_chars)
+                if cut is None:
+                    # the long token may go on in the next piece
+                    break
+                yield buffer[:cut]
+                buffer = buffer[cut:]
+        if buffer:
+            yield buffer
 
-    def save_to_excel(self, df: pd.DataFrame, output_path: Path):
+    def _find_boundary(self, text: str, limit: int) -> Optional[int]:
+        # prefer the last sentence end in the second half of the window, then the last whitespace
+        window = text[:limit]
+        cut = max(window.rfind(char) for char in self.BOUNDARY_CHARS) + 1
+        if cut > limit // 2:
+            return cut
+        cut = max(window.rfind(char) for char in " \t\r\f\v") + 1
+        if cut > 0:
+            return cut
+        # a single token longer than the window: extend to the next whitespace
+        match = _WHITESPACE.search(text, limit)
+        return match.end() if match else None
+
+    def save_table(self, df: "pd.DataFrame", output_path: Path):
+        output_path = output_path.with_suffix(self.output_format.value)
+        if self.writer is not None and self.writer.is_owned():
+            self.writer.submit(self.write_table, df, output_path, self.output_format)
+        else:
+            self.write_table(df, output_path, self.output_format)
+
+    def stream_table(self, rows: Iterable, columns: List[str], output_path: Path) -> int:
+        # written row by row as the rows are produced, for tables too large to build in memory or to fit a sheet
+        output_path = output_path.with_suffix(OutputFormat.CSV.value)
         output_path.parent.mkdir(exist_ok=True)
-        df.to_excel(output_path, index=False)
\ No newline at end of file
+        row_count = 0
+        # a failure halfway leaves no partial table behind
+        fd, tmp_path = tempfile.mkstemp(dir=output_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8-sig", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                for row in rows:
+                    writer.writerow(row)
+                    row_count += 1
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return row_count
+
+    def write_table(self, df: "pd.DataFrame", output_path: Path, output_format: OutputFormat):
+        output_path.parent.mkdir(exist_ok=True)
+        with instrumentation.stage("save"):
+            if output_format == OutputFormat.XLSX:
+                self.save_to_excel(df, output_path)
+            elif output_format == OutputFormat.CSV:
+                df.to_csv(output_path, index=False, encoding='utf-8-sig')
+            elif output_format == OutputFormat.PARQUET:
+                df.to_parquet(output_path, index=False)
+            elif output_format == OutputFormat.FEATHER:
+                df.reset_index(drop=True).to_feather(output_path)
+
+    def save_to_excel(self, df: "pd.DataFrame", output_path: Path):
+        output_path.parent.mkdir(exist_ok=True)
+        df.to_excel(output_path, index=False)
+
+    @contextmanager
+    def background_writer(self, max_pending: int = 64):
+        self.writer = ResultWriter(max_pending)
+        try:
+            yield self.writer
+            self.writer.flush()
+        finally:
+            writer, self.writer = self.writer, None
+            writer.close()
\ No newline at end of file
@@ -0,0 +1,134 @@
+from .analysis_cache import AnalysisCache
+from . import aggregate_file
+from pathlib import Path
+from typing import Dict, List, Tuple
+import pickle
+import sqlite3
+import zlib
+
+class FileChanges:
+    def __init__(self):
+        self.added = []
+        self.changed = []
+        self.removed = []
+        self.unchanged = 0
+        # entries whose mtime moved but whose content hash did not: only the manifest row is refreshed
+        self.touched = []
+
+    def to_analyze(self) -> List[Tuple[str, str, Path, int, int, str]]:
+        return self.added + self.changed
+
+class IncrementalStore:
+    FORMAT_VERSION = 3
+
+    def __init__(self, state_dir: str, operation: str, analyzer_key: str):
+        self.path = Path(state_dir) / f"{operation}.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.operation = operation
+        # the year totals live in a file next to the database, named by generation; the row naming
+        # the current file is part of the transaction, so a rollback never exposes a half-written update
+        self.written_file = None
+        self.replaced_file = None
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, year TEXT, size INTEGER, "
+            "mtime_ns INTEGER, digest TEXT, record BLOB)"
+        )
+        self.connection.execute("CREATE TABLE IF NOT EXISTS aggregates (name TEXT PRIMARY KEY, value BLOB)")
+        stored = dict(self.connection.execute("SELECT key, value FROM meta"))
+        expected = {"format_version": str(self.FORMAT_VERSION), "analyzer_key": analyzer_key}
+        if stored != expected:
+            # another analyzer or dictionary version: every stored record is stale
+            self.connection.execute("DELETE FROM files")
+            self.connection.execute("DELETE FROM aggregates")
+            self.connection.execute("DELETE FROM meta")
+            self.connection.executemany("INSERT INTO meta VALUES (?, ?)", expected.items())
+            self.connection.commit()
+            for stale in self.path.parent.glob(f"{operation}.*.aggregate"):
+                stale.unlink()
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def _dump(value) -> bytes:
+        return zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 1)
+
+    @staticmethod
+    def _load(blob: bytes):
+        return pickle.loads(zlib.decompress(blob))
+
+    def scan(self, files: Dict[str, Tuple[str, Path]]) -> FileChanges:
+        changes = FileChanges()
+        manifest = {
+            path: (size, mtime_ns, digest)
+            for path, size, mtime_ns, digest in self.connection.execute("SELECT path, size, mtime_ns, digest FROM files")
+        }
+        for relative_path, (year, file_path) in files.items():
+            stat = file_path.stat()
+            known = manifest.pop(relative_path, None)
+            if known is not None and known[:2] == (stat.st_size, stat.st_mtime_ns):
+                changes.unchanged += 1
+                continue
+            # size and mtime are only a hint, the content hash decides
+            digest = AnalysisCache.file_digest(file_path)
+            entry = (relative_path, year, file_path, stat.st_size, stat.st_mtime_ns, digest)
+            if known is None:
+                changes.added.append(entry)
+            elif known[2] == digest:
+                changes.touched.append(entry)
+                changes.unchanged += 1
+            else:
+                changes.changed.append(entry)
+        changes.removed = sorted(manifest)
+        return changes
+
+    def record(self, relative_path: str):
+        row = self.connection.execute("SELECT year, record FROM files WHERE path = ?", (relative_path,)).fetchone()
+        return (row[0], self._load(row[1])) if row is not None else (None, None)
+
+    def put_record(self, relative_path: str, year: str, size: int, mtime_ns: int, digest: str, record):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+            (relative_path, year, size, mtime_ns, digest, self._dump(record))
+        )
+
+    def touch(self, relative_path: str, size: int, mtime_ns: int):
+        self.connection.execute(
+            "UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?", (size, mtime_ns, relative_path)
+        )
+
+    def delete_record(self, relative_path: str):
+        self.connection.execute("DELETE FROM files WHERE path = ?", (relative_path,))
+
+    def _aggregate_file(self) -> Path:
+        row = self.connection.execute("SELECT value FROM aggregates WHERE name = 'years'").fetchone()
+        return self.path.parent / row[0] if row is not None else None
+
+    def aggregate(self, settings=None):
+        path = self._aggregate_file()
+        if path is None:
+            return None
+        with open(path, "rb") as f:
+            return aggregate_file.load(f, settings)
+
+    def put_aggregate(self, aggregate):
+        self.replaced_file = self._aggregate_file()
+        generation = int(self.replaced_file.name.split(".")[-2]) + 1 if self.replaced_file is not None else 1
+        self.written_file = self.path.parent / f"{self.operation}.{generation}.aggregate"
+        with open(self.written_file, "wb") as f:
+            aggregate_file.dump(aggregate, f)
+        self.connection.execute("INSERT OR REPLACE INTO aggregates VALUES ('years', ?)", (self.written_file.name,))
+
+    def commit(self):
+        self.connection.commit()
+        if self.replaced_file is not None:
+            self.replaced_file.unlink(missing_ok=True)
+        self.written_file = self.replaced_file = None
+
+    def rollback(self):
+        self.connection.rollback()
+        if self.written_file is not None:
+            self.written_file.unlink(missing_ok=True)
+        self.written_file = self.replaced_file = None
\ No newline at end of file
@@ -0,0 +1,182 @@
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from threading import Lock
+import heapq
+import json
+import os
+import sys
+import time
+
+_DISABLED_STAGE = nullcontext()
+
+def token_count(result) -> int:
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        return sum(token_count(value) if isinstance(value, dict) else value for value in result.values())
+    return 0
+
+class Instrumentation:
+    def __init__(self, slowest_files: int = 10, progress_interval: float = 1.0):
+        self.enabled = False
+        self.progress = False
+        self.slowest_files = slowest_files
+        self.progress_interval = progress_interval
+        self.lock = Lock()
+        self.owner_pid = os.getpid()
+        self.reset()
+
+    def enable(self, progress: bool = True):
+        self.enabled = True
+        self.progress = progress
+        self.owner_pid = os.getpid()
+        self.reset()
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.started_at = time.perf_counter()
+        self.last_progress = 0.0
+        self.stage_seconds = defaultdict(float)
+        self.stage_calls = defaultdict(int)
+        self.counters = defaultdict(int)
+        self.slowest = []
+
+    @contextmanager
+    def _timed(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.stage_seconds[name] += elapsed
+                self.stage_calls[name] += 1
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _DISABLED_STAGE
+        return self._timed(name)
+
+    def count(self, name: str, value: int = 1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] += value
+
+    def record_file(self, file_path: Path, seconds: float, tokens: int):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters["files"] += 1
+            self.counters["tokens"] += tokens
+            self._push_slowest((seconds, str(file_path), tokens))
+        self._maybe_report_progress()
+
+    def _push_slowest(self, entry):
+        if len(self.slowest) < self.slowest_files:
+            heapq.heappush(self.slowest, entry)
+        elif entry > self.slowest[0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def _maybe_report_progress(self):
+        # worker processes only collect, the owning process draws the progress line
+        if not self.progress or os.getpid() != self.owner_pid:
+            return
+        now = time.perf_counter()
+        if now - self.last_progress < self.progress_interval:
+            return
+        self.last_progress = now
+        elapsed = now - self.started_at
+        files, tokens = self.counters["files"], self.counters["tokens"]
+        sys.stderr.write(
+            f"\rФайлов: {files}, токенов: {tokens}, {tokens / elapsed if elapsed else 0:.0f} ток/с, {elapsed:.0f} с"
+        )
+        sys.stderr.flush()
+
+    def drain(self) -> dict:
+        with self.lock:
+            snapshot = {
+                "stage_seconds": dict(self.stage_seconds),
+                "stage_calls": dict(self.stage_calls),
+                "counters": dict(self.counters),
+                "slowest": list(self.slowest),
+            }
+            self.stage_seconds.clear()
+            self.stage_calls.clear()
+            self.counters.clear()
+            self.slowest = []
+        return snapshot
+
+    def absorb(self, snapshot: dict):
+        with self.lock:
+            for name, seconds in snapshot["stage_seconds"].items():
+                self.stage_seconds[name] += seconds
+            for name, calls in snapshot["stage_calls"].items():
+                self.stage_calls[name] += calls
+            for name, value in snapshot["counters"].items():
+                self.counters[name] += value
+            for entry in snapshot["slowest"]:
+                self._push_slowest(tuple(entry))
+        if snapshot["counters"].get("files"):
+            self._maybe_report_progress()
+
+    def summary(self) -> dict:
+        with self.lock:
+            elapsed = time.perf_counter() - self.started_at
+            return {
+                "elapsed_seconds": round(elapsed, 3),
+                "stages": {
+                    name: {"seconds": round(self.stage_seconds[name], 3), "calls": self.stage_calls[name]}
+                    for name in sorted(self.stage_seconds)
+                },
+                "counters": dict(sorted(self.counters.items())),
+                "tokens_per_second": round(self.counters["tokens"] / elapsed, 1) if elapsed else 0.0,
+                "slowest_files": [
+                    {"path": path, "seconds": round(seconds, 3), "tokens": tokens}
+                    for seconds, path, tokens in sorted(self.slowest, reverse=True)
+                ],
+            }
+
+    def write_summary(self, output_path: Path):
+        summary = self.summary()
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if output_path.suffix == ".prom":
+            output_path.write_text(self._to_prometheus(summary), encoding="utf-8")
+        else:
+            output_path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def _to_prometheus(self, summary: dict) -> str:
+        lines = [
+            "# TYPE textanalyzer_run_seconds gauge",
+            f"textanalyzer_run_seconds {summary['elapsed_seconds']}",
+            "# TYPE textanalyzer_stage_seconds gauge",
+        ]
+        lines.extend(
+            f'textanalyzer_stage_seconds{{stage="{name}"}} {stage["seconds"]}'
+            for name, stage in summary["stages"].items()
+        )
+        lines.append("# TYPE textanalyzer_stage_calls gauge")
+        lines.extend(
+            f'textanalyzer_stage_calls{{stage="{name}"}} {stage["calls"]}'
+            for name, stage in summary["stages"].items()
+        )
+        lines.append("# TYPE textanalyzer_count gauge")
+        lines.extend(f'textanalyzer_count{{name="{name}"}} {value}' for name, value in summary["counters"].items())
+        lines.append("# TYPE textanalyzer_slowest_file_seconds gauge")
+        # the same file shows up once per operation, the rank keeps each series unique
+        lines.extend(
+            'textanalyzer_slowest_file_seconds{rank="%d",path="%s"} %s'
+            % (rank, entry["path"].replace("\\", "\\\\").replace('"', '\\"'), entry["seconds"])
+            for rank, entry in enumerate(summary["slowest_files"], 1)
+        )
+        return "\n".join(lines) + "\n"
+
+    def finish_progress(self):
+        if self.enabled and self.progress and self.counters["files"]:
+            sys.stderr.write("\n")
+            sys.stderr.flush()
+
+instrumentation = Instrumentation()
\ No newline at end of file
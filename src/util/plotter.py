@@ -1,18 +1,100 @@
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from ..model.enums import PlotType
+from ..model.enums import PlotType, PlotMode
+from .instrumentation import instrumentation
+import argparse
+import json
+import multiprocessing
+
+SPEC_SUFFIX = ".plot.json"
+
+def _plain(values) -> list:
+    # numpy scalars are not JSON serializable and pickle slower than builtins
+    return [value.item() if hasattr(value, "item") else value for value in values]
+
+def render_plot(spec: dict):
+    # matplotlib is imported on first render only, runs that skip or defer plots never load it
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    # a fresh Figure per call keeps rendering free of pyplot's global state, so it is safe in threads and processes
+    figure = Figure(figsize=(10, 6))
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    if spec["plot_type"] == PlotType.BAR.value:
+        axes.bar(spec["years"], spec["values"])
+    elif spec["plot_type"] == PlotType.LINE.value:
+        axes.plot(spec["years"], spec["values"], marker='o')
+    axes.set_xlabel(spec["xlabel"])
+    axes.set_ylabel(spec["ylabel"])
+    axes.set_title(spec["title"])
+    axes.grid(True)
+    output_path = Path(spec["output_path"])
+    output_path.parent.mkdir(exist_ok=True)
+    figure.savefig(output_path)
+
+def render_specs(spec_paths):
+    rendered = 0
+    for spec_path in spec_paths:
+        spec_path = Path(spec_path)
+        spec = json.loads(spec_path.read_text(encoding="utf-8"))
+        # the stored path may be relative to another working directory, the image belongs next to its data
+        spec["output_path"] = str(spec_path.parent / Path(spec["output_path"]).name)
+        render_plot(spec)
+        rendered += 1
+    return rendered
 
 class Plotter:
+    def __init__(self, mode: PlotMode = PlotMode.IMMEDIATE, max_workers: int = 4):
+        self.mode = mode
+        self.max_workers = max_workers
+        self.pending = []
+
     def create_plot(self, years, values, plot_type: PlotType, title: str, xlabel: str, ylabel: str, output_path: Path):
-        plt.figure(figsize=(10, 6))
-        if plot_type == PlotType.BAR:
-            plt.bar(years, values)
-        elif plot_type == PlotType.LINE:
-            plt.plot(years, values, marker='o')
-        plt.xlabel(xlabel)
-        plt.ylabel(ylabel)
-        plt.title(title)
-        plt.grid(True)
-        output_path.parent.mkdir(exist_ok=True)
-        plt.savefig(output_path)
-        plt.close()
\ No newline at end of file
+        if self.mode == PlotMode.SKIP:
+            return
+        spec = {
+            "years": _plain(years), "values": _plain(values), "plot_type": plot_type.value,
+            "title": title, "xlabel": xlabel, "ylabel": ylabel, "output_path": str(output_path),
+        }
+        if self.mode == PlotMode.PARALLEL:
+            self.pending.append(spec)
+        elif self.mode == PlotMode.DEFERRED:
+            output_path.parent.mkdir(exist_ok=True)
+            spec_path = output_path.with_suffix(SPEC_SUFFIX)
+            spec_path.write_text(json.dumps(spec, ensure_ascii=False), encoding="utf-8")
+        else:
+            with instrumentation.stage("plot"):
+                render_plot(spec)
+
+    def flush(self):
+        pending, self.pending = self.pending, []
+        if not pending:
+            return
+        with instrumentation.stage("plot"):
+            if len(pending) == 1 or self.max_workers == 1:
+                for spec in pending:
+                    render_plot(spec)
+                return
+            # flush runs while the result writer thread is alive, a forked child could inherit its held locks;
+            # render_plot needs nothing from this process, so fresh interpreters are started instead
+            with ProcessPoolExecutor(
+                max_workers=min(self.max_workers, len(pending)), mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                list(executor.map(render_plot, pending, chunksize=max(1, len(pending) // (self.max_workers * 4))))
+
+    def __getstate__(self):
+        # worker processes never flush, pending plots belong to the main process
+        state = self.__dict__.copy()
+        state["pending"] = []
+        return state
+
+def main():
+    parser = argparse.ArgumentParser(description="Render plots saved in deferred mode")
+    parser.add_argument("directory", type=Path, nargs="?", default=Path("results"))
+    args = parser.parse_args()
+    rendered = render_specs(sorted(args.directory.rglob(f"*{SPEC_SUFFIX}")))
+    print(f"Построено графиков: {rendered}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,42 @@
+from queue import Queue
+from threading import Thread
+import os
+
+class ResultWriter:
+    def __init__(self, max_pending: int = 64):
+        self.queue = Queue(maxsize=max_pending)
+        self.errors = []
+        self.pid = os.getpid()
+        self.thread = Thread(target=self._run, name="result-writer", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            task = self.queue.get()
+            try:
+                if task is None:
+                    return
+                func, args = task
+                func(*args)
+            except Exception as e:
+                self.errors.append(e)
+            finally:
+                self.queue.task_done()
+
+    def is_owned(self) -> bool:
+        # a forked worker inherits this object but not the thread behind it
+        return self.pid == os.getpid()
+
+    def submit(self, func, *args):
+        # blocks when max_pending writes are queued, so producers cannot outrun the disk
+        self.queue.put((func, args))
+
+    def flush(self):
+        self.queue.join()
+        if self.errors:
+            errors, self.errors = self.errors, []
+            raise RuntimeError(f"Failed to write {len(errors)} result file(s): {errors[0]}") from errors[0]
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
\ No newline at end of file
@@ -0,0 +1,31 @@
+from .instrumentation import instrumentation
+from collections import defaultdict
+from pathlib import Path
+import numpy as np
+import tempfile
+
+class SpillStore:
+    def __init__(self, directory: str = None):
+        if directory is not None:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+        # removed together with the owning aggregate, or at interpreter exit at the latest
+        self.directory = tempfile.TemporaryDirectory(prefix="spill-", dir=directory)
+        self.run_counts = defaultdict(int)
+
+    def _run_path(self, key: int, run: int) -> Path:
+        return Path(self.directory.name) / f"{key}-{run}.npz"
+
+    def write(self, key: int, rows: np.ndarray, cols: np.ndarray, counts: np.ndarray):
+        with instrumentation.stage("spill"):
+            np.savez(self._run_path(key, self.run_counts[key]), rows=rows, cols=cols, counts=counts)
+        self.run_counts[key] += 1
+        instrumentation.count("spilled_runs")
+
+    def runs(self, key: int):
+        for run in range(self.run_counts[key]):
+            with np.load(self._run_path(key, run)) as data:
+                yield data["rows"], data["cols"], data["counts"]
+
+    def close(self):
+        self.directory.cleanup()
+        self.run_counts.clear()
\ No newline at end of file
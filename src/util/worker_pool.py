@@ -0,0 +1,123 @@
+from ..model.enums import ExecutionMode
+from .instrumentation import instrumentation
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import Iterable, Iterator, List, Tuple
+import gc
+import multiprocessing
+
+_worker_func = None
+_worker_analyzer = None
+
+def _init_worker(func, analyzer, instrumented):
+    global _worker_func, _worker_analyzer
+    _worker_func = func
+    _worker_analyzer = analyzer
+    # a forked worker must not resend the parent's numbers
+    if instrumented:
+        instrumentation.enable(progress=False)
+    else:
+        instrumentation.disable()
+
+def _run_in_worker(item, args):
+    return _worker_func(item, _worker_analyzer, *args)
+
+def _run_instrumented_in_worker(item, args):
+    return _worker_func(item, _worker_analyzer, *args), instrumentation.drain()
+
+def _unwrap_instrumented(inner: Future, outer: Future):
+    if inner.cancelled():
+        outer.cancel()
+    elif inner.exception() is not None:
+        outer.set_exception(inner.exception())
+    else:
+        result, snapshot = inner.result()
+        instrumentation.absorb(snapshot)
+        outer.set_result(result)
+
+def run_pipeline(items: Iterable, pools: List["WorkerPool"], read=None, readers: int = 2,
+                 max_pending: int = None) -> Iterator[Tuple[object, int, object]]:
+    # reader threads -> analysis pools -> caller, yielding (item, pool index, result) as soon as each result is ready;
+    # at most max_pending items are read or analyzed at a time, so a slow consumer stalls reading instead of piling up results
+    max_pending = max_pending or 2 * sum(pool.max_workers for pool in pools)
+    items = iter(items)
+    reading, analyzing, remaining = {}, {}, {}
+    with ThreadPoolExecutor(readers, thread_name_prefix="reader") if read is not None else nullcontext() as reader:
+        def analyze(item, payload):
+            for index, pool in enumerate(pools):
+                analyzing[pool.submit(payload)] = (item, index)
+
+        def refill():
+            while len(remaining) < max_pending:
+                item = next(items, None)
+                if item is None:
+                    return
+                remaining[item] = len(pools)
+                if read is None:
+                    analyze(item, item)
+                else:
+                    reading[reader.submit(read, item)] = item
+
+        refill()
+        while remaining:
+            done, _ = wait(list(reading) + list(analyzing), return_when=FIRST_COMPLETED)
+            results = []
+            for future in done:
+                if future in reading:
+                    analyze(reading.pop(future), future.result())
+                    continue
+                item, index = analyzing.pop(future)
+                results.append((item, index, future.result()))
+                remaining[item] -= 1
+                if not remaining[item]:
+                    del remaining[item]
+            # workers get new items before the caller merges, so they never idle on the merge
+            refill()
+            yield from results
+
+class WorkerPool:
+    def __init__(self, func, analyzer, mode: ExecutionMode = ExecutionMode.THREAD, max_workers: int = 8):
+        self.func = func
+        self.analyzer = analyzer
+        self.mode = mode
+        self.max_workers = max_workers
+        self.executor = None
+
+    def __enter__(self):
+        self.frozen = False
+        if self.mode == ExecutionMode.PROCESS:
+            if multiprocessing.get_start_method() == "fork":
+                # everything loaded so far, above all the morphological dictionaries, moves out of gc's reach,
+                # so collections in the forked workers do not touch those pages and they stay shared copy-on-write
+                gc.freeze()
+                self.frozen = True
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.func, self.analyzer, instrumentation.enabled)
+            )
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.executor.shutdown(wait=True, cancel_futures=exc_type is not None)
+        self.executor = None
+        if self.frozen:
+            gc.unfreeze()
+
+    def submit(self, item, *args) -> Future:
+        # func and analyzer travel once per worker via the initializer, only items and results are pickled per task
+        if self.mode == ExecutionMode.PROCESS and instrumentation.enabled:
+            # worker stats ride back with each result and are merged here
+            outer = Future()
+            inner = self.executor.submit(_run_instrumented_in_worker, item, args)
+            inner.add_done_callback(lambda done: _unwrap_instrumented(done, outer))
+            return outer
+        if self.mode == ExecutionMode.PROCESS:
+            return self.executor.submit(_run_in_worker, item, args)
+        return self.executor.submit(self.func, item, self.analyzer, *args)
+
+    def map_unordered(self, items: Iterable, read=None, max_pending: int = None) -> Iterator[Tuple[object, object]]:
+        for item, _, result in run_pipeline(items, [self], read, max_pending=max_pending):
+            yield item, result
\ No newline at end of file